@@ -17,12 +17,27 @@
 #    \ \_\ \_\ \_\ \_\ \____/\ \____/\ \_____\ `\___x___/\ \____\ \____\ \_\ \_\
 #     \/_/\/_/\/_/\/_/\/___/  \/___/  \/_____/'\/__//__/  \/____/\/____/\/_/\/_/
 
+import asyncio
 import heapq
+import mmap
 import multiprocessing
+import os
 import queue
+import signal
 import string
-from functools import lru_cache
-from itertools import chain
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections import Counter
+from functools import lru_cache, partial
+from itertools import chain, product
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
 
 def lex(formula):
@@ -101,184 +116,470 @@ class ParseError(Exception):
     pass
 
 
+class SymbolTable:
+    """Interned symbols and shared constant and Skolem terms for a batch.
+
+    Every name is interned, so equal symbols are one object and compare by
+    identity, and each (name, role, arity) gets a small int id in the order
+    the parser completes them, so arguments come before the symbol applied
+    to them.
+    The role is 'predicate', 'function', 'constant' or 'skolem'.
+    A constant or Skolem term is built once and shared by every clause of
+    every set parsed with the table.
+    Interning only depends on the names, so a worker that does not inherit
+    the table by forking rebuilds an equivalent one as it parses.
+    """
+
+    __slots__ = ('ids', 'symbols', '_terms')
+
+    def __init__(self):
+        self.ids = dict()
+        self.symbols = []
+        self._terms = dict()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def symbol(self, name, role, arity=0):
+        """Return the interned name, registering it under the role."""
+        key = sys.intern(name), role, arity
+        if key not in self.ids:
+            self.ids[key] = len(self.symbols)
+            self.symbols.append(key)
+        return key[0]
+
+    def id(self, name, role, arity=0):
+        """Return the small int id of the symbol."""
+        return self.ids[name, role, arity]
+
+    def constant(self, name):
+        """Return the shared term of the constant."""
+        term = self._terms.get(name)
+        if term is None:
+            term = self._terms[name] = \
+                self.symbol(name, 'constant'), ()
+        return term
+
+    def skolem(self, name, arguments):
+        """Return the shared Skolem term with the given variables."""
+        key = name, arguments
+        term = self._terms.get(key)
+        if term is None:
+            name = self.symbol(name, 'skolem', len(arguments))
+            term = self._terms[key] = name, arguments
+        return term
+
+    def role(self, term):
+        """Return the role of the root of a term built with the table."""
+        fun, arguments = term
+        if self._terms.get((fun, arguments)) is term:
+            return 'skolem'
+        return 'function' if arguments else 'constant'
+
+    def clear(self):
+        """Forget every symbol, e.g. between unrelated batches."""
+        self.__init__()
+
+
+# the table shared by every formula set of the process
+_SYMBOLS = SymbolTable()
+
+
+# how a connective combines the CNFs of its operands
+_CONJUNCTION, _DISJUNCTION = 'conjunction', 'disjunction'
+
+
 class _CnfParser:
+    """Single pass CNF conversion with explicit stacks instead of recursion.
+
+    The clauses of the subformulae being parsed are kept as tuples of
+    literals in one flat list, where every open connective owns the
+    segment from its start offset to the end.
+    A conjunction just leaves the segments of its operands side by side,
+    and a disjunction replaces them by their pairwise concatenations, so
+    frozensets are only built for the final clauses.
+    """
+
     __slots__ = (
         'fresh_num',
-        'negated',
-        'peek_token',
         'tokens',
         'substitutions',
+        'symbols',
         'universal_context',
         'variables',
     )
 
-    def __init__(self, tokens):
+    def __init__(self, tokens, symbols=None):
         self.fresh_num = -1
-        self.negated = False
-        self.peek_token = None
         self.tokens = tokens
+        self.symbols = _SYMBOLS if symbols is None else symbols
         self.universal_context = []
         self.substitutions = dict()
         self.variables = set()
 
     def formula(self):
-        token = self._next()
-
-        if token != '(':
-            return token
-
-        expr = self._expr()
-        self._expect(')')
-        return expr
-
-    def _expect(self, token):
-        if self._next() != token:
-            raise ParseError
-
-    def _expr(self):
-        token = self._next()
-        if self.negated:
-            if token == 'FORALL':
-                # ~ forall x, p x = exists x, ~ p x
-                return self._existential()
-            if token == 'EXISTS':
-                # ~ exists x, p x = forall x, ~ p x
-                return self._universal()
-            if token == 'AND':
-                # ~ (p /\ q) = ~ p \/ ~ q
-                left = self.formula()
-                right = self.formula()
-                return frozenset(l | r for l in left for r in right)
-            if token == 'OR':
-                # ~ (p \/ q) = ~ p /\ ~ q
-                return self.formula() | self.formula()
+        try:
+            token = next(self.tokens)
+            if token != '(':
+                return token
+            return self._formula()
+        except StopIteration as e:
+            raise ParseError from e
+
+    def _formula(self):
+        tokens = self.tokens
+        clauses = []
+        # each frame is (kind, negated, start offset, data), where the data
+        # of a binary connective is the offset of its second operand once
+        # that has started, and that of an existential the old binding
+        frames = []
+        negated = False
+        opened = True
+
+        while True:
+            if not opened and next(tokens) != '(':
+                raise ParseError
+            opened = False
+            token = next(tokens)
+
+            if token in ('FORALL', 'EXISTS'):
+                # ~ forall x, p x = exists x, ~ p x and vice versa
+                if (token == 'FORALL') != negated:
+                    quantifier = self._quantified_variable()
+                    self.variables.add(quantifier)
+                    self.universal_context.append(quantifier)
+                    frames.append(('FORALL', negated, None, None))
+                else:
+                    quantifier = self._quantified_variable()
+                    frames.append(('EXISTS', negated, None, (
+                        quantifier, self.substitutions.get(quantifier))))
+                    self.substitutions[quantifier] = self.symbols.skolem(
+                        quantifier, tuple(self.universal_context))
+                continue
+            if token in ('AND', 'OR'):
+                # ~ (p /\ q) = ~ p \/ ~ q and ~ (p \/ q) = ~ p /\ ~ q
+                kind = _CONJUNCTION if (token == 'AND') != negated \
+                    else _DISJUNCTION
+                frames.append((kind, negated, len(clauses), []))
+                continue
             if token == 'IMPLIES':
-                # ~ (p -> q) = ~ (~ p \/ q) = p /\ ~ q
-                self.negated = False
-                antecedent = self.formula()
-                self.negated = True
-                return antecedent | self.formula()
+                # p -> q = ~ p \/ q and ~ (p -> q) = p /\ ~ q
+                kind = _CONJUNCTION if negated else _DISJUNCTION
+                frames.append((kind, negated, len(clauses), []))
+                negated = not negated
+                continue
             if token == 'NOT':
                 # ~ ~ p = p
-                self.negated = False
-                formula = self.formula()
-                self.negated = True
-                return formula
-            return frozenset((
-                frozenset((
-                    ('NOT', (token, self._terms())),
-                )),
-            ))
-
-        if token == 'FORALL':
-            return self._universal()
-        if token == 'EXISTS':
-            return self._existential()
-        if token == 'AND':
-            return self.formula() | self.formula()
-        if token == 'OR':
-            left = self.formula()
-            right = self.formula()
-            return frozenset(l | r for l in left for r in right)
-        if token == 'IMPLIES':
-            # p -> q = ~ p \/ q
-            self.negated = True
-            antecedent = self.formula()
-            self.negated = False
-            consequent = self.formula()
-            return frozenset(l | r for l in antecedent for r in consequent)
-        if token == 'NOT':
-            self.negated = True
-            formula = self.formula()
-            self.negated = False
-            return formula
-        return frozenset((
-            frozenset((
-                (token, self._terms()),
-            )),
-        ))
-
-    def _next(self):
-        if self.peek_token is not None:
-            token = self.peek_token
-            self.peek_token = None
-            return token
-
-        return next(self.tokens)
-
-    def _existential(self):
-        ex_quantifier = self._quantified_variable()
-        old_sub = self.substitutions.get(ex_quantifier, None)
-        self.substitutions[ex_quantifier] = (
-            ex_quantifier, tuple(self.universal_context))
-        formula = self.formula()
-        if old_sub:
-            self.substitutions[ex_quantifier] = old_sub
-        else:
-            del self.substitutions[ex_quantifier]
-        return formula
+                frames.append(('NOT', negated, None, None))
+                negated = not negated
+                continue
 
-    def _universal(self):
-        quantifier = self._quantified_variable()
-        self.variables.add(quantifier)
-        self.universal_context.append(quantifier)
-        formula = self.formula()
-        self.universal_context.pop()
-        return formula
+            arguments = self._terms()
+            atom = self.symbols.symbol(
+                token, 'predicate', len(arguments)), arguments
+            clauses.append((('NOT', atom) if negated else atom,))
+
+            # close the connectives whose last operand this completed
+            while frames:
+                kind, negated, start, data = frames[-1]
+                if kind in (_CONJUNCTION, _DISJUNCTION):
+                    if not data:
+                        # the first operand is done, the second is next
+                        data.append(len(clauses))
+                        break
+                    if kind == _DISJUNCTION:
+                        middle = data[0]
+                        clauses[start:] = [
+                            left + right
+                            for left in clauses[start:middle]
+                            for right in clauses[middle:]]
+                elif kind == 'FORALL':
+                    self.universal_context.pop()
+                elif kind == 'EXISTS':
+                    quantifier, old_sub = data
+                    if old_sub:
+                        self.substitutions[quantifier] = old_sub
+                    else:
+                        del self.substitutions[quantifier]
+                frames.pop()
+                if next(tokens) != ')':
+                    raise ParseError
+
+            if not frames:
+                return frozenset(frozenset(clause) for clause in clauses)
+
+            # the second operand of IMPLIES has the connective's polarity
+            negated = frames[-1][1]
 
     def _quantified_variable(self):
-        var = self._next()
+        var = next(self.tokens)
         if var in self.variables:
             var = str(self.fresh_num)
             self.fresh_num -= 1
-        return var
+        return sys.intern(var)
 
     def _terms(self):
-        terms = []
+        # the arguments up to and including the closing parenthesis, with
+        # a stack of the function symbols and arguments of open subterms
+        tokens = self.tokens
+        variables = self.variables
+        substitutions = self.substitutions
+        symbols = self.symbols
+        roots = []
+        arguments = [[]]
         while True:
-            token = self._peek()
+            token = next(tokens)
             if token == ')':
-                return tuple(terms)
-            if token == '(':
-                self._next()
-                terms.append(self._sub_term())
+                if not roots:
+                    return tuple(arguments[0])
+                subterms = tuple(arguments.pop())
+                term = symbols.symbol(
+                    roots.pop(), 'function', len(subterms)), subterms
+                arguments[-1].append(term)
+            elif token == '(':
+                root = next(tokens)
+                if root in {'(', ')'}:
+                    raise ParseError
+                roots.append(root)
+                arguments.append([])
+            elif token in variables:
+                arguments[-1].append(sys.intern(token))
             else:
-                self._next()
-                terms.append(token if token in self.variables
-                             else self.substitutions.get(token, (token, ())))
+                arguments[-1].append(
+                    substitutions.get(token) or symbols.constant(token))
 
-    def _peek(self):
-        if self.peek_token is None:
-            try:
-                self.peek_token = next(self.tokens)
-            except StopIteration as e:
-                raise ParseError from e
-        return self.peek_token
-
-    def _sub_term(self):
-        root = self._next()
-        if root in {'(', ')'}:
-            raise ParseError
-        terms = []
-        while True:
-            token = self._next()
-            if token == ')':
-                return root, tuple(terms)
-            if token == '(':
-                terms.append(self._sub_term())
-            else:
-                terms.append(token if token in self.variables
-                             else self.substitutions.get(token, (token, ())))
 
-
-def parse(formula_tokens):
+def parse(formula_tokens, symbols=None):
     """Parse the token stream into CNF."""
-    return _CnfParser(formula_tokens).formula()
+    return _CnfParser(formula_tokens, symbols).formula()
 
 
-def str_to_cnf(string):
+def str_to_cnf(string, symbols=None):
     """Parse the input string into CNF."""
-    return parse(lex(string))
+    return parse(lex(string), symbols)
+
+
+_CACHE_MAGIC = b'CNF2'
+_CACHE_HEADER = struct.Struct('<4sIQQQ')
+# each symbol of a cache is stored as the first letter of its role and name
+_CACHE_ROLES = ('variable', 'predicate', 'function', 'constant', 'skolem')
+
+
+def _encode_term(term, role, symbol_ids, data, symbols):
+    # pre-order with an explicit stack, so deep terms do not recurse
+    stack = [(term, role)]
+    while stack:
+        term, role = stack.pop()
+        if isinstance(term, str):
+            key = 'variable', term
+            data.append(-symbol_ids.setdefault(key, len(symbol_ids)) - 1)
+            continue
+
+        fun, arguments = term
+        key = role or symbols.role(term), fun
+        data.append(symbol_ids.setdefault(key, len(symbol_ids)))
+        data.append(len(arguments))
+        stack.extend((argument, None) for argument in reversed(arguments))
+
+
+def _decoded_term(symbols, role, name, arguments):
+    if role == 'skolem':
+        return symbols.skolem(name, arguments)
+    if role == 'constant':
+        return symbols.constant(name)
+    return symbols.symbol(name, role, len(arguments)), arguments
+
+
+def _decode_term(data, index, names, symbols):
+    # the open subterms, each with its role, name, arity and arguments
+    frames = []
+    while True:
+        code = data[index]
+        if code < 0:
+            term = names[-code - 1][1]
+            index += 1
+        else:
+            role, name = names[code]
+            arity = data[index + 1]
+            index += 2
+            if arity:
+                frames.append((role, name, arity, []))
+                continue
+            term = _decoded_term(symbols, role, name, ())
+
+        # close the subterms whose last argument this completed
+        while frames:
+            role, name, arity, arguments = frames[-1]
+            arguments.append(term)
+            if len(arguments) < arity:
+                break
+            frames.pop()
+            term = _decoded_term(symbols, role, name, tuple(arguments))
+        else:
+            return term, index
+
+
+def compile_sets(fSets, path, symbols=None):  # noqa
+    """Write the CNF of each formula list to a precompiled cache file.
+
+    The file holds a symbol table, a flat array of integers encoding every
+    clause, and the offset of each formula set into that array.
+    Integers are stored in native byte order, so the cache is machine-local.
+    """
+    symbols = _SYMBOLS if symbols is None else symbols
+    symbol_ids = dict()
+    data = array('i')
+    offsets = array('q', [0])
+
+    for formulae in fSets:
+        clauses = clause_set(formulae, symbols)
+        data.append(len(clauses))
+        for clause in clauses:
+            data.append(len(clause))
+            for literal in clause:
+                if literal[0] == 'NOT':
+                    data.append(1)
+                    literal = literal[1]
+                else:
+                    data.append(0)
+                _encode_term(literal, 'predicate', symbol_ids, data,
+                             symbols)
+        offsets.append(len(data))
+
+    names = sorted(symbol_ids, key=symbol_ids.__getitem__)
+    symbol_bytes = '\n'.join(
+        role[0] + name for role, name in names).encode('utf-8')
+    padding = -(_CACHE_HEADER.size + len(symbol_bytes)) % 8
+
+    with open(path, 'wb') as cache:
+        cache.write(_CACHE_HEADER.pack(_CACHE_MAGIC, data.itemsize,
+                                       len(offsets) - 1,
+                                       len(symbol_bytes) + padding,
+                                       len(data)))
+        cache.write(symbol_bytes)
+        cache.write(b'\0' * padding)
+        offsets.tofile(cache)
+        data.tofile(cache)
+
+    return CompiledSets(path, symbols)
+
+
+class CompiledSet:
+    """Handle to a single formula set inside a CompiledSets cache."""
+
+    __slots__ = ('sets', 'index')
+
+    def __init__(self, sets, index):
+        self.sets = sets
+        self.index = index
+
+    def clauses(self):
+        """Decode the CNF of this formula set."""
+        return self.sets.clauses(self.index)
+
+
+class CompiledSets:
+    """Memory-mapped formula sets written by compile_sets.
+
+    Nothing is read until the first set is decoded, and only the clauses of
+    the requested set are decoded, so forked workers share the mapping.
+    """
+
+    __slots__ = ('path', 'symbols', '_map', '_names', '_offsets', '_data')
+
+    def __init__(self, path, symbols=None):
+        self.path = path
+        self.symbols = symbols
+        self._map = None
+        self._names = None
+        self._offsets = None
+        self._data = None
+
+    def __getstate__(self):
+        return self.path
+
+    def __setstate__(self, path):
+        self.__init__(path)
+
+    def __len__(self):
+        self._load()
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return CompiledSet(self, index)
+
+    def __iter__(self):
+        return (CompiledSet(self, index) for index in range(len(self)))
+
+    def _load(self):
+        if self._map is not None:
+            return
+
+        with open(self.path, 'rb') as cache:
+            contents = mmap.mmap(cache.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, itemsize, num_sets, symbols_size, data_size = \
+            _CACHE_HEADER.unpack_from(contents)
+        if magic != _CACHE_MAGIC or itemsize != array('i').itemsize:
+            contents.close()
+            raise ValueError('not a compiled clause-set cache: '
+                             + str(self.path))
+
+        view = memoryview(contents)
+        start = _CACHE_HEADER.size
+        symbols = bytes(view[start:start + symbols_size]).rstrip(b'\0')
+        roles = {role[0]: role for role in _CACHE_ROLES}
+        self._names = [(roles[name[0]], sys.intern(name[1:]))
+                       for name in symbols.decode('utf-8').split('\n')
+                       if name]
+        start += symbols_size
+        end = start + (num_sets + 1) * 8
+        self._offsets = view[start:end].cast('q')
+        self._data = view[end:end + data_size * itemsize].cast('i')
+        self._map = contents
+
+    def clauses(self, index):
+        """Decode the CNF of the formula set at the given index."""
+        self._load()
+        data = self._data
+        names = self._names
+        symbols = _SYMBOLS if self.symbols is None else self.symbols
+        position = self._offsets[index]
+        clauses = []
+
+        position += 1
+        for _ in range(data[position - 1]):
+            literals = []
+            position += 1
+            for _ in range(data[position - 1]):
+                negated = data[position]
+                atom, position = _decode_term(data, position + 1, names,
+                                              symbols)
+                literals.append(('NOT', atom) if negated else atom)
+            clauses.append(frozenset(literals))
+
+        return frozenset(clauses)
+
+    def close(self):
+        """Release the memory mapping; it is reopened on demand."""
+        if self._map is None:
+            return
+        self._offsets.release()
+        self._data.release()
+        self._map.close()
+        self.__init__(self.path, self.symbols)
+
+
+def clause_set(formulae, symbols=None):
+    """Return the CNF of a formula list or of a CompiledSet handle."""
+    if isinstance(formulae, CompiledSet):
+        return formulae.clauses()
+
+    cnf = set()
+    for formula in formulae:
+        cnf |= str_to_cnf(formula, symbols)
+    return frozenset(cnf)
 
 
 def find_disagreement(first_term, second_term):
@@ -349,6 +650,8 @@ def unify(term_one, term_two):
             return None
 
         new_substitution = {variable: term}
+        for bound, value in substitutions.items():
+            substitutions[bound] = substitute(new_substitution, value)
         substitutions.update(new_substitution)
         term_one = substitute(new_substitution, term_one)
         term_two = substitute(new_substitution, term_two)
@@ -374,8 +677,9 @@ def resolve(left_clause, right_clause):
                 (('NOT', substitute(unifier, lit[1]))
                  if lit[0] == 'NOT'
                  else substitute(unifier, lit))
-                for lit in chain(left_clause, right_clause)
-                if lit not in (('NOT', literal), match)
+                for lit in chain(
+                    (l for l in left_clause if l != ('NOT', literal)),
+                    (l for l in right_clause if l != match))
             )
 
             return result
@@ -395,8 +699,9 @@ def resolve(left_clause, right_clause):
             (('NOT', substitute(unifier, lit[1]))
                 if lit[0] == 'NOT'
                 else substitute(unifier, lit))
-            for lit in chain(left_clause, right_clause)
-            if lit not in (('NOT', match), literal)
+            for lit in chain(
+                (l for l in left_clause if l != literal),
+                (l for l in right_clause if l != ('NOT', match)))
         )
 
         return result
@@ -419,8 +724,9 @@ def resolve(left_clause, right_clause):
                 (('NOT', substitute(unifier, lit[1]))
                  if lit[0] == 'NOT'
                  else substitute(unifier, lit))
-                for lit in chain(left_clause, right_clause)
-                if lit not in (('NOT', literal), match)
+                for lit in chain(
+                    (l for l in left_clause if l != match),
+                    (l for l in right_clause if l != ('NOT', literal)))
             )
 
             return result
@@ -440,8 +746,9 @@ def resolve(left_clause, right_clause):
             (('NOT', substitute(unifier, lit[1]))
                 if lit[0] == 'NOT'
                 else substitute(unifier, lit))
-            for lit in chain(left_clause, right_clause)
-            if lit not in (literal, ('NOT', match))
+            for lit in chain(
+                (l for l in left_clause if l != ('NOT', match)),
+                (l for l in right_clause if l != literal))
         )
 
         return result
@@ -449,41 +756,1994 @@ def resolve(left_clause, right_clause):
     return None
 
 
-def find_contradiction(event, clauses):
-    clause_heap = [(len(c), c) for c in list(clauses)]
+def _renamed_literals(clause, tag):
+    # suffix every variable so that the clause shares none with another,
+    # mapping each literal to its renamed copy
+    names = dict()
+    for literal in clause:
+        term_stack = [literal[1] if literal[0] == 'NOT' else literal]
+        while term_stack:
+            term = term_stack.pop()
+            if isinstance(term, str):
+                names[term] = '{}~{}'.format(term, tag)
+            else:
+                term_stack.extend(term[1])
+    return {literal: ('NOT', substitute(names, literal[1]))
+            if literal[0] == 'NOT' else substitute(names, literal)
+            for literal in clause}
+
+
+def _rename_apart(clause, tag):
+    return frozenset(_renamed_literals(clause, tag).values())
+
+
+def _clash(clashing, residue, partners):
+    # resolve each clashing literal against a complementary literal of one
+    # of its partner clauses at once, under a single unifier
+    def search(index, substitutions, residue):
+        if index == len(clashing):
+            yield frozenset(
+                ('NOT', substitute(substitutions, literal[1]))
+                if literal[0] == 'NOT' else substitute(substitutions, literal)
+                for literal in residue)
+            return
+        literal = clashing[index]
+        negated = literal[0] == 'NOT'
+        atom = substitute(substitutions, literal[1] if negated else literal)
+        for partner in partners(literal):
+            partner = _rename_apart(partner, index)
+            for match in partner:
+                if (match[0] == 'NOT') == negated:
+                    continue
+                match_atom = match if negated else match[1]
+                if match_atom[0] != atom[0]:
+                    continue
+                unifier = unify(atom, match_atom)
+                if unifier is None:
+                    continue
+                composed = {variable: substitute(unifier, term)
+                            for variable, term in substitutions.items()}
+                composed.update(unifier)
+                yield from search(index + 1, composed, residue + [
+                    l for l in partner if l != match])
+
+    return search(0, dict(), list(residue))
+
+
+def hyperresolve(nucleus, satellites):
+    """Resolve all negative literals of the nucleus at once.
+
+    Each negative literal is resolved against a positive literal of one of
+    the satellites, which should be positive clauses.
+    Returns the set of positive hyperresolvents.
+    """
+    clashing = [literal for literal in nucleus if literal[0] == 'NOT']
+    if not clashing:
+        return set()
+    residue = [literal for literal in nucleus if literal[0] != 'NOT']
+    return set(_clash(clashing, residue, lambda literal: satellites))
+
+
+def ur_resolve(nucleus, units):
+    """Resolve all but at most one literal of the nucleus against units.
+
+    Returns the set of unit-resulting resolvents, which are unit clauses
+    or the empty clause.
+    """
+    resolvents = set()
+    literals = list(nucleus)
+    for kept in [None] + literals:
+        clashing = [literal for literal in literals if literal != kept]
+        if clashing:
+            resolvents.update(_clash(clashing, () if kept is None else
+                                     (kept,), lambda literal: units))
+    return resolvents
+
+
+def symbol_precedence(clauses):
+    """Rank the predicate and function symbols of the clauses.
+
+    Symbols of higher arity rank higher, and among those of equal arity,
+    rarer symbols do, as in the usual invfreq precedence.
+    Returns a dict from each symbol to its distinct rank.
+    """
+    arities = dict()
+    occurrences = Counter()
+    for clause in clauses:
+        term_stack = [literal[1] if literal[0] == 'NOT' else literal
+                      for literal in clause]
+        while term_stack:
+            term = term_stack.pop()
+            if not isinstance(term, str):
+                arities[term[0]] = max(arities.get(term[0], 0), len(term[1]))
+                occurrences[term[0]] += 1
+                term_stack.extend(term[1])
+    order = sorted(arities, key=lambda symbol: (
+        arities[symbol], -occurrences[symbol], symbol))
+    return {symbol: rank for rank, symbol in enumerate(order)}
+
+
+def _select_none(clause):
+    return ()
+
+
+def _select_negative(clause):
+    # the heaviest negative literal, as in the selection functions of
+    # saturation provers that prefer to resolve large hypotheses first
+    negative = [literal for literal in clause if literal[0] == 'NOT']
+    if not negative:
+        return ()
+    return (max(negative,
+                key=lambda literal: (clause_weight((literal,)),
+                                     _literal_shape(literal))),)
+
+
+_SELECTIONS = {
+    'none': _select_none,
+    'negative': _select_negative,
+}
+
+
+class TermOrdering:
+    """Simplification ordering on terms and literals for ordered resolution.
+
+    kind is 'kbo' for the Knuth-Bendix ordering, with the positive symbol
+    weights (1 by default), or 'lpo' for the lexicographic path ordering.
+    Both extend the symbol precedence, a dict from symbols to ranks such as
+    symbol_precedence() returns.
+    selection is 'none', 'negative' (the heaviest negative literal) or a
+    function from a clause to the negative literals it selects.
+    """
+
+    __slots__ = ('precedence', 'kind', 'weights', 'selection', '_eligible')
+
+    def __init__(self, precedence, kind='kbo', selection='negative',
+                 weights=None):
+        if kind not in ('kbo', 'lpo'):
+            raise ValueError('unknown term ordering: {!r}'.format(kind))
+        self.precedence = precedence
+        self.kind = kind
+        self.weights = weights or dict()
+        self.selection = _SELECTIONS.get(selection, selection)
+        self._eligible = dict()
+
+    def _weigh(self, term):
+        weight = 0
+        variables = Counter()
+        term_stack = [term]
+        while term_stack:
+            term = term_stack.pop()
+            if isinstance(term, str):
+                weight += 1
+                variables[term] += 1
+            else:
+                weight += self.weights.get(term[0], 1)
+                term_stack.extend(term[1])
+        return weight, variables
+
+    def _kbo_greater(self, left, right):
+        while left != right and not isinstance(left, str):
+            left_weight, left_variables = self._weigh(left)
+            right_weight, right_variables = self._weigh(right)
+            if any(left_variables[variable] < count
+                   for variable, count in right_variables.items()):
+                return False
+            if left_weight != right_weight:
+                return left_weight > right_weight
+            if isinstance(right, str):
+                return False
+            if left[0] != right[0]:
+                return (self.precedence.get(left[0], -1)
+                        > self.precedence.get(right[0], -1))
+            # the first differing argument decides
+            left, right = next((pair for pair in zip(left[1], right[1])
+                                if pair[0] != pair[1]))
+        return False
+
+    def _lpo_greater(self, left, right):
+        if left == right or isinstance(left, str):
+            return False
+        if isinstance(right, str):
+            return variable_in_term(right, left)
+        if any(argument == right or self._lpo_greater(argument, right)
+               for argument in left[1]):
+            return True
+        if left[0] == right[0]:
+            difference = next((pair for pair in zip(left[1], right[1])
+                               if pair[0] != pair[1]), None)
+            if difference is None or not self._lpo_greater(*difference):
+                return False
+        elif (self.precedence.get(left[0], -1)
+              < self.precedence.get(right[0], -1)):
+            return False
+        return all(self._lpo_greater(left, argument)
+                   for argument in right[1])
+
+    def greater(self, left, right):
+        """Check whether the left term is greater than the right term."""
+        if self.kind == 'kbo':
+            return self._kbo_greater(left, right)
+        return self._lpo_greater(left, right)
+
+    def literal_greater(self, left, right):
+        """Compare literals by their atoms, then negative over positive."""
+        left_atom = left[1] if left[0] == 'NOT' else left
+        right_atom = right[1] if right[0] == 'NOT' else right
+        if left_atom == right_atom:
+            return left[0] == 'NOT' and right[0] != 'NOT'
+        return self.greater(left_atom, right_atom)
+
+    def eligible(self, clause):
+        """Return the literals of the clause that may be resolved upon.
+
+        These are the selected literals if there are any, and otherwise
+        the literals that no other literal of the clause is greater than.
+        """
+        eligible = self._eligible.get(clause)
+        if eligible is None:
+            eligible = frozenset(self.selection(clause)) or frozenset(
+                literal for literal in clause
+                if not any(self.literal_greater(other, literal)
+                           for other in clause))
+            self._eligible[clause] = eligible
+        return eligible
+
+
+def ordered_resolve(left_clause, right_clause, ordering):
+    """Resolve the clauses upon their eligible literals under the ordering.
+
+    Returns the set of all such resolvents.
+    """
+    left_eligible = ordering.eligible(left_clause)
+    right_eligible = ordering.eligible(right_clause)
+    if not {(literal[0] == 'NOT', _predicate(literal))
+            for literal in left_eligible} & {
+                (literal[0] != 'NOT', _predicate(literal))
+                for literal in right_eligible}:
+        return set()
+    renamed = _renamed_literals(right_clause, 'r')
+    right_eligible = [renamed[literal] for literal in right_eligible]
+    right_clause = frozenset(renamed.values())
+    resolvents = set()
+    for literal in left_eligible:
+        negated = literal[0] == 'NOT'
+        atom = literal[1] if negated else literal
+        for match in right_eligible:
+            if (match[0] == 'NOT') == negated:
+                continue
+            match_atom = match if negated else match[1]
+            if match_atom[0] != atom[0]:
+                continue
+            unifier = unify(atom, match_atom)
+            if unifier is None:
+                continue
+            resolvents.add(frozenset(
+                ('NOT', substitute(unifier, lit[1])) if lit[0] == 'NOT'
+                else substitute(unifier, lit)
+                for lit in chain(
+                    (l for l in left_clause if l != literal),
+                    (l for l in right_clause if l != match))))
+    return resolvents
+
+
+def ordered_factors(clause, ordering):
+    """Unify an eligible literal of the clause with another of its sign.
+
+    Returns the set of factors, which ordered resolution needs to stay
+    complete.
+    """
+    factors = set()
+    for literal in ordering.eligible(clause):
+        negated = literal[0] == 'NOT'
+        for other in clause:
+            if other == literal or (other[0] == 'NOT') != negated \
+                    or _predicate(other) != _predicate(literal):
+                continue
+            unifier = unify(literal[1], other[1]) if negated \
+                else unify(literal, other)
+            if unifier is not None:
+                factors.add(frozenset(
+                    ('NOT', substitute(unifier, lit[1])) if lit[0] == 'NOT'
+                    else substitute(unifier, lit)
+                    for lit in clause))
+    return factors
+
+
+class Unknown:
+    """Falsy result of a search that was stopped before deciding.
+
+    dropped counts the clauses discarded by the weight limit, which make
+    the search incomplete.
+    """
+
+    __slots__ = ('reason', 'dropped')
+
+    def __init__(self, reason, dropped=0):
+        self.reason = reason
+        self.dropped = dropped
+
+    def __bool__(self):
+        return False
+
+    def __eq__(self, other):
+        return isinstance(other, Unknown) and other.reason == self.reason
+
+    def __hash__(self):
+        return hash(self.reason)
+
+    def __repr__(self):
+        if self.dropped:
+            return 'Unknown({!r}, dropped={!r})'.format(self.reason,
+                                                        self.dropped)
+        return 'Unknown({!r})'.format(self.reason)
+
+
+def _resident_bytes():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, IndexError, ValueError):
+        if resource is None:
+            return 0
+        # the peak rather than the current size, in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# seconds between two checks of the limits by Limits.charge
+_CHECK_SLICE = 0.01
+
+
+class Limits:
+    """Resource limits shared by the searches for one problem.
+
+    The deadline is a time.monotonic() value, max_clauses bounds the number
+    of generated clauses and max_bytes the resident set size.
+    charge() looks at the clock and the memory use at most every
+    check_interval calls, so charging once per resolution attempt is cheap,
+    and more often when the calls are slow, so that no limit is overshot by
+    much more than a time slice.
+    """
+
+    __slots__ = ('deadline', 'max_clauses', 'max_bytes', 'check_interval',
+                 'generated', 'dropped', '_countdown', '_interval',
+                 '_checked')
+
+    def __init__(self, deadline=None, max_clauses=None, max_bytes=None,
+                 check_interval=1024):
+        self.deadline = deadline
+        self.max_clauses = max_clauses
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+        self.generated = 0
+        self.dropped = 0
+        self._countdown = 0
+        self._interval = 1
+        self._checked = None
+
+    def charge(self, clauses=0):
+        """Count generated clauses, returning the reason a limit is hit."""
+        self.generated += clauses
+        self._countdown -= 1
+        if self._countdown > 0:
+            return None
+        # fit the calls between two checks into one time slice
+        now = time.monotonic()
+        if self._checked is not None:
+            elapsed = now - self._checked
+            if elapsed > _CHECK_SLICE:
+                self._interval = max(
+                    int(self._interval * _CHECK_SLICE / elapsed), 1)
+            else:
+                self._interval = min(2 * self._interval, self.check_interval)
+        self._checked = now
+        self._countdown = self._interval
+        return self.exceeded()
+
+    def exceeded(self):
+        """Return the reason a limit has been hit, or None."""
+        if self.max_clauses is not None and self.generated > self.max_clauses:
+            return 'clauses'
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            return 'deadline'
+        if self.max_bytes is not None and _resident_bytes() > self.max_bytes:
+            return 'memory'
+        return None
+
+
+def _literal_shape(literal):
+    # the literal in prefix order with its variables blanked out
+    negated = literal[0] == 'NOT'
+    shape = ['-' if negated else '+']
+    term_stack = [literal[1] if negated else literal]
+    while term_stack:
+        term = term_stack.pop()
+        if isinstance(term, str):
+            shape.append('')
+        else:
+            shape.append(term[0])
+            term_stack.extend(reversed(term[1]))
+    return tuple(shape)
+
+
+def canonical_clause(clause):
+    """Rename the variables of the clause to _0, _1, ... by first occurrence.
+
+    Literals are ordered by their shape with the variables blanked out, so
+    clauses that differ only in variable names usually become equal.
+    Literals of the same shape are taken in arbitrary order, which can
+    only hide a duplicate, never merge clauses that are not variants.
+    """
+    names = dict()
+    for literal in sorted(clause, key=_literal_shape):
+        term_stack = [literal[1] if literal[0] == 'NOT' else literal]
+        while term_stack:
+            term = term_stack.pop()
+            if isinstance(term, str):
+                if term not in names:
+                    names[term] = '_{}'.format(len(names))
+            else:
+                term_stack.extend(reversed(term[1]))
+
+    if all(name == new_name for name, new_name in names.items()):
+        return clause
+    return frozenset(
+        ('NOT', substitute(names, literal[1])) if literal[0] == 'NOT'
+        else substitute(names, literal)
+        for literal in clause)
+
+
+def clause_weight(clause):
+    """Count the symbol occurrences in the clause."""
+    weight = 0
+    term_stack = [literal[1] if literal[0] == 'NOT' else literal
+                  for literal in clause]
+    while term_stack:
+        term = term_stack.pop()
+        weight += 1
+        if not isinstance(term, str):
+            term_stack.extend(term[1])
+    return weight
+
+
+_WEIGHT_LIMIT_INTERVAL = 128
+
+# reasons for which a search with a bigger budget may still succeed
+_BUDGET_REASONS = frozenset({'given clauses', 'conflicts', 'incomplete'})
+
+
+def _weight_limit(clause_heap, selected, started, limits):
+    # as in the limited resource strategy, estimate how many passive
+    # clauses can still be selected and keep only the lightest of them
+    reachable = len(clause_heap)
+    if limits.deadline is not None:
+        now = time.monotonic()
+        rate = selected / max(now - started, 1e-6)
+        reachable = min(reachable, int(rate * max(limits.deadline - now, 0)))
+    if limits.max_bytes is not None:
+        used = _resident_bytes()
+        if 2 * used > limits.max_bytes:
+            # shrink the passive clauses as memory runs out
+            room = max(limits.max_bytes - used, 0) / (limits.max_bytes / 2)
+            reachable = min(reachable, int(len(clause_heap) * room))
+    if reachable >= len(clause_heap):
+        return None
+    return heapq.nsmallest(reachable + 1, (e[1] for e in clause_heap))[-1]
+
+
+# stands in for an inference too deep to build
+_TOO_DEEP = object()
+
+
+def _is_positive(clause):
+    return all(literal[0] != 'NOT' for literal in clause)
+
+
+def _binary_inferences(given, clauses, active):
+    for right_clause in clauses:
+        try:
+            yield resolve(given, right_clause)
+        except RecursionError:
+            yield _TOO_DEEP
+
+
+def _hyper_inferences(given, clauses, active):
+    satellites = [clause for clause in active if _is_positive(clause)]
+    if not _is_positive(given):
+        nuclei = [(given, None)]
+    else:
+        # the given clause takes the place of at least one satellite
+        predicates = {literal[0] for literal in given}
+        nuclei = [(nucleus, literal) for nucleus in active
+                  for literal in nucleus
+                  if literal[0] == 'NOT' and literal[1][0] in predicates]
+    for nucleus, position in nuclei:
+        clashing = [literal for literal in nucleus if literal[0] == 'NOT']
+        residue = [literal for literal in nucleus if literal[0] != 'NOT']
+        try:
+            yield from _clash(
+                clashing, residue, lambda literal, position=position:
+                [given] if literal == position else satellites)
+        except RecursionError:
+            yield _TOO_DEEP
+        yield None
+
+
+def _ur_inferences(given, clauses, active):
+    units = [clause for clause in active if len(clause) == 1]
+    if len(given) > 1:
+        nuclei = [(given, None)]
+    else:
+        (unit,) = given
+        nuclei = [(nucleus, literal) for nucleus in active
+                  for literal in nucleus
+                  if (literal[0] == 'NOT') != (unit[0] == 'NOT')
+                  and _predicate(literal) == _predicate(unit)]
+    for nucleus, position in nuclei:
+        for kept in [None] + list(nucleus):
+            if kept is not None and kept == position:
+                continue
+            clashing = [literal for literal in nucleus if literal != kept]
+            try:
+                yield from _clash(
+                    clashing, () if kept is None else (kept,),
+                    lambda literal, position=position:
+                    [given] if literal == position else units)
+            except RecursionError:
+                yield _TOO_DEEP
+        yield None
+
+
+def _ordered_inferences(given, clauses, active, ordering):
+    try:
+        yield from ordered_factors(given, ordering)
+    except RecursionError:
+        yield _TOO_DEEP
+    for clause in active:
+        try:
+            yield from ordered_resolve(given, clause, ordering)
+        except RecursionError:
+            yield _TOO_DEEP
+        yield None
+
+
+# the inference rules of find_contradiction, each generating the
+# inferences between the given clause and the active clauses (or, for
+# binary resolution, the input clauses), with None for failed attempts
+_INFERENCE_RULES = {
+    'binary': _binary_inferences,
+    'hyper': _hyper_inferences,
+    'ur': _ur_inferences,
+    'ordered': _ordered_inferences,
+}
+
+
+def find_contradiction(clauses, limits=None, support=None, max_given=None,
+                       rule='binary', ordering=None, processes=None):
+    """Search for the empty clause by resolving against the given clauses.
+
+    When support is given, only those clauses (and their descendants) are
+    selected, i.e. the rest of the clauses are assumed to be consistent.
+    The inference rule is one of
+        'binary': binary resolution of each selected clause against the
+            input clauses,
+        'hyper': positive hyperresolution, keeping only positive
+            resolvents, between the selected clauses,
+        'ur': unit-resulting resolution between the selected clauses,
+            which is incomplete, so running out of clauses with it is
+            Unknown('incomplete'),
+        'ordered': resolution and factoring between the selected clauses
+            upon the literals eligible under a TermOrdering, by default
+            the Knuth-Bendix ordering over symbol_precedence(clauses)
+            with the heaviest negative literal selected.
+    Returns an Unknown result once the limits are hit or max_given clauses
+    have been selected.
+    With a deadline or a memory limit, passive clauses heavier than what
+    the remaining resources are estimated to reach are dropped; running
+    out of clauses after dropping some is Unknown('incomplete').
+    With more than one process, the binary and ordered rules run in
+    parallel, see _find_contradiction_parallel.
+    """
+    if limits is None:
+        limits = Limits()
+    if processes is not None and processes > 1:
+        return _find_contradiction_parallel(clauses, limits, support,
+                                            max_given, rule, ordering,
+                                            processes)
+    inferences = _INFERENCE_RULES[rule]
+    if rule == 'ordered':
+        inferences = partial(inferences, ordering=ordering or TermOrdering(
+            symbol_precedence(clauses)))
+    clause_heap = [(len(c), clause_weight(c), c)
+                   for c in list(clauses if support is None else support)]
     heapq.heapify(clause_heap)
-    while not event.is_set() and clause_heap:
-        _, left_clause = heapq.heappop(clause_heap)
-        for right_clause in clauses:
-            resolvent = resolve(left_clause, right_clause)
-            if resolvent is not None:
+    active = [] if support is None else list(set(clauses) - set(support))
+    # resolvents are kept in canonical form, so variants are dropped and
+    # their variables never clash with those of the input clauses
+    seen = {canonical_clause(clause) for clause in clauses}
+    seen.update(canonical_clause(entry[2]) for entry in clause_heap)
+    adaptive = limits.deadline is not None or limits.max_bytes is not None
+    started = time.monotonic()
+    selected = 0
+    weight_limit = None
+    dropped = limits.dropped
+    while clause_heap:
+        if max_given is not None:
+            if max_given <= 0:
+                return Unknown('given clauses', limits.dropped - dropped)
+            max_given -= 1
+        _, _, left_clause = heapq.heappop(clause_heap)
+
+        selected += 1
+        if adaptive and selected % _WEIGHT_LIMIT_INTERVAL == 0:
+            weight_limit = _weight_limit(clause_heap, selected, started,
+                                         limits)
+            if weight_limit is not None:
+                kept = [entry for entry in clause_heap
+                        if entry[1] <= weight_limit]
+                limits.dropped += len(clause_heap) - len(kept)
+                clause_heap = kept
+                heapq.heapify(clause_heap)
+
+        active.append(left_clause)
+        for resolvent in inferences(left_clause, clauses, active):
+            try:
+                if resolvent is _TOO_DEEP:
+                    raise RecursionError
+                if resolvent is not None:
+                    resolvent = canonical_clause(resolvent)
+            except RecursionError:
+                # too deep to build, so as good as over the weight limit
+                limits.dropped += 1
+                continue
+            if resolvent is not None and resolvent not in seen:
                 if resolvent == frozenset():
                     return True
-                heapq.heappush(clause_heap, (len(resolvent), resolvent))
+                seen.add(resolvent)
+                weight = clause_weight(resolvent)
+                if weight_limit is None or weight <= weight_limit:
+                    heapq.heappush(clause_heap,
+                                   (len(resolvent), weight, resolvent))
+                else:
+                    limits.dropped += 1
+            reason = limits.charge(resolvent is not None)
+            if reason is not None:
+                return Unknown(reason, limits.dropped - dropped)
+
+    if limits.dropped > dropped or rule == 'ur':
+        return Unknown('incomplete', limits.dropped - dropped)
+    return False
+
+
+def _owner(clause, processes):
+    # a hash that agrees between processes, unlike hash() of strings
+    return zlib.crc32(''.join(sorted(map(repr, clause))).encode()) \
+        % processes
+
+
+class _LimitReached(Exception):
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _saturation_target(index, clauses, initial, background, inboxes, results,
+                       outstanding, counts, rule, ordering, limits,
+                       max_given):
+    # one worker of _find_contradiction_parallel, owning the clauses that
+    # _owner maps to its index
+    processes = len(inboxes)
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+    inbox = inboxes[index]
+    inferences = _INFERENCE_RULES[rule]
+    if rule == 'ordered':
+        inferences = partial(inferences, ordering=ordering)
+    seen = set(initial)
+    clause_heap = [(len(c), clause_weight(c), c)
+                   for c in initial if _owner(c, processes) == index]
+    heapq.heapify(clause_heap)
+    own_active = []
+    active = list(background)
+    outboxes = [[] for _ in range(processes)]
+    kept = [0]
+    reported = [0, 0]
+
+    def add_work(count):
+        with outstanding.get_lock():
+            outstanding.value += count
+
+    def keep(resolvent):
+        # route the resolvent to its owner, which drops it if seen before
+        owner = _owner(resolvent, processes)
+        if owner != index:
+            outboxes[owner].append(resolvent)
+        elif resolvent not in seen:
+            seen.add(resolvent)
+            heapq.heappush(clause_heap, (len(resolvent),
+                                         clause_weight(resolvent), resolvent))
+            kept[0] += 1
+
+    def infer(resolvents):
+        # keep the resolvents, returning whether one of them is empty
+        for resolvent in resolvents:
+            try:
+                if resolvent is _TOO_DEEP:
+                    raise RecursionError
+                if resolvent is not None:
+                    resolvent = canonical_clause(resolvent)
+            except RecursionError:
+                limits.dropped += 1
+                continue
+            if resolvent == frozenset():
+                return True
+            if resolvent is not None:
+                keep(resolvent)
+            reason = limits.charge(resolvent is not None)
+            if reason is not None:
+                raise _LimitReached(reason)
+        return False
+
+    def flush():
+        # count the new clauses before anyone can process them
+        sent = sum(len(outbox) for outbox in outboxes)
+        if sent + kept[0]:
+            add_work(sent + kept[0])
+            kept[0] = 0
+        with counts.get_lock():
+            counts[0] += limits.generated - reported[0]
+            counts[1] += limits.dropped - reported[1]
+        reported[:] = limits.generated, limits.dropped
+        for owner, outbox in enumerate(outboxes):
+            if outbox:
+                inboxes[owner].put(('new', outbox))
+                outboxes[owner] = []
+
+    try:
+        while True:
+            while True:
+                try:
+                    kind, message = inbox.get(block=not clause_heap,
+                                              timeout=0.01)
+                except queue.Empty:
+                    break
+                finished = 0
+                if kind == 'new':
+                    for clause in message:
+                        if clause in seen:
+                            finished += 1
+                        else:
+                            seen.add(clause)
+                            heapq.heappush(clause_heap, (
+                                len(clause), clause_weight(clause), clause))
+                else:
+                    # inferences between a clause selected by another
+                    # worker and those selected here, which that worker
+                    # may not have had yet
+                    active.append(message)
+                    if infer(inferences(message, clauses, own_active)):
+                        results.put(True)
+                        return
+                    finished = 1
+                flush()
+                if finished:
+                    add_work(-finished)
+
+            if not clause_heap:
+                if outstanding.value == 0:
+                    results.put(False)
+                    return
+                continue
+
+            if max_given is not None:
+                if max_given <= 0:
+                    results.put(Unknown('given clauses'))
+                    return
+                max_given -= 1
+            _, _, given = heapq.heappop(clause_heap)
+            own_active.append(given)
+            active.append(given)
+            if rule == 'ordered':
+                add_work(processes - 1)
+                for owner, other_inbox in enumerate(inboxes):
+                    if owner != index:
+                        other_inbox.put(('active', given))
+            if infer(inferences(given, clauses, active)):
+                results.put(True)
+                return
+            flush()
+            add_work(-1)
+    except _LimitReached as limit:
+        results.put(Unknown(limit.reason))
+    except MemoryError:
+        results.put(Unknown('memory'))
+
+
+def _find_contradiction_parallel(clauses, limits, support, max_given, rule,
+                                 ordering, processes):
+    """Run the given clause loop of find_contradiction in several processes.
+
+    Every clause is owned by one worker, chosen by a hash of its canonical
+    form, and only its owner selects it, so the owner alone drops it if it
+    is a variant of an earlier clause.
+    Each worker sends the resolvents of its given clauses to their owners
+    through queues.
+    For ordered resolution, a worker also sends each of its given clauses
+    to all others, and a worker receiving one resolves it against its own
+    given clauses, so that no pair of given clauses is missed.
+    A shared count of the clauses not yet processed, raised before
+    sending and lowered after processing, detects that the workers have
+    run out of clauses.
+    """
+    if rule not in ('binary', 'ordered'):
+        raise ValueError(
+            'no parallel search with the {!r} rule'.format(rule))
+    clauses = list(clauses)
+    if rule == 'ordered' and ordering is None:
+        ordering = TermOrdering(symbol_precedence(clauses))
+    initial = {canonical_clause(clause)
+               for clause in (clauses if support is None else support)}
+    if frozenset() in initial:
+        return True
+    background = [] if support is None or rule != 'ordered' \
+        else list(set(clauses) - set(support))
+
+    worker_limits = Limits(
+        deadline=limits.deadline, max_bytes=limits.max_bytes,
+        max_clauses=None if limits.max_clauses is None
+        else limits.max_clauses // processes,
+        check_interval=limits.check_interval)
+    if max_given is not None:
+        max_given = -(-max_given // processes)
+    outstanding = multiprocessing.Value('q', len(initial))
+    # the clauses generated and dropped by all workers
+    counts = multiprocessing.Array('q', 2)
+    inboxes = [multiprocessing.Queue() for _ in range(processes)]
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(
+        target=_saturation_target,
+        args=(index, clauses, initial, background, inboxes, results,
+              outstanding, counts, rule, ordering, worker_limits,
+              max_given))
+        for index in range(processes)]
+    result = None
+    try:
+        for worker in workers:
+            worker.start()
+        while result is None:
+            try:
+                result = results.get(timeout=0.01)
+            except queue.Empty:
+                reason = limits.exceeded()
+                if reason is not None:
+                    result = Unknown(reason)
+                elif not any(worker.is_alive() for worker in workers) \
+                        and results.empty():
+                    # the workers ran out of memory
+                    result = Unknown('memory')
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+        limits.generated += counts[0]
+        limits.dropped += counts[1]
+        for inbox in inboxes:
+            inbox.cancel_join_thread()
+            inbox.close()
+    if isinstance(result, Unknown):
+        return Unknown(result.reason, counts[1])
+    if result is False and counts[1]:
+        return Unknown('incomplete', counts[1])
+    return result
+
+
+def _luby(index):
+    # the index-th element (from 1) of 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    size = 1
+    while size < index + 1:
+        size = 2 * size + 1
+    while size > 1:
+        size //= 2
+        if index > size:
+            index -= size
+        elif index == size:
+            return (size + 1) // 2
+    return 1
+
+
+_RESTART_INTERVAL = 64
+
+
+def satisfiable(clauses, num_vars, max_conflicts=None, limits=None):
+    """Decide a propositional CNF by conflict-driven clause learning.
+
+    Clauses are sequences of non-zero ints over the variables 1..num_vars,
+    negated when negative, as in DIMACS.
+    Propagation watches two literals per clause, every conflict learns its
+    first unique implication point clause, decisions follow the VSIDS
+    activity of the variables with saved phases, and the search restarts
+    after a Luby sequence of conflicts.
+    Returns whether the clauses are satisfiable, None after max_conflicts
+    conflicts, or an Unknown result once the limits are hit.
+    """
+    # the value of every literal, indexed by num_vars + literal
+    values = [0] * (2 * num_vars + 1)
+    levels = [0] * (num_vars + 1)
+    reasons = [None] * (num_vars + 1)
+    phases = [-1] * (num_vars + 1)
+    activity = [0.0] * (num_vars + 1)
+    watches = [[] for _ in range(2 * num_vars + 1)]
+    database = []
+    trail = []
+    trail_limits = []
+
+    def assign(literal, reason):
+        variable = abs(literal)
+        values[num_vars + literal] = 1
+        values[num_vars - literal] = -1
+        levels[variable] = len(trail_limits)
+        reasons[variable] = reason
+        trail.append(literal)
+
+    def watch(clause):
+        watches[num_vars + clause[0]].append(len(database))
+        watches[num_vars + clause[1]].append(len(database))
+        database.append(clause)
+
+    units = []
+    for clause in clauses:
+        clause = list(set(clause))
+        if not clause:
+            return False
+        if len(clause) == 1:
+            units.append(clause[0])
+        elif not any(-literal in clause for literal in clause):
+            watch(clause)
+    for literal in units:
+        if values[num_vars + literal] == -1:
+            return False
+        if values[num_vars + literal] == 0:
+            assign(literal, None)
+
+    # the unassigned variables are in a heap ordered by activity, with
+    # stale entries skipped when they are popped
+    for clause in database:
+        for literal in clause:
+            activity[abs(literal)] += 1.0
+    order = [(-activity[v], v) for v in range(1, num_vars + 1)]
+    heapq.heapify(order)
+    increment = 1.0
+
+    def bump(variable):
+        nonlocal increment
+        activity[variable] += increment
+        if activity[variable] > 1e100:
+            for v in range(1, num_vars + 1):
+                activity[v] *= 1e-100
+            increment *= 1e-100
+        if values[num_vars + variable] == 0:
+            heapq.heappush(order, (-activity[variable], variable))
+
+    def backtrack(level):
+        if len(trail_limits) <= level:
+            return
+        for literal in trail[trail_limits[level]:]:
+            variable = abs(literal)
+            phases[variable] = 1 if literal > 0 else -1
+            values[num_vars + literal] = values[num_vars - literal] = 0
+            reasons[variable] = None
+            heapq.heappush(order, (-activity[variable], variable))
+        del trail[trail_limits[level]:]
+        del trail_limits[level:]
+
+    def propagate(head):
+        # returns the index of a conflicting clause, or None
+        while head < len(trail):
+            false_literal = -trail[head]
+            head += 1
+            watchers = watches[num_vars + false_literal]
+            kept = []
+            for position, index in enumerate(watchers):
+                clause = database[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if values[num_vars + clause[0]] == 1:
+                    kept.append(index)
+                    continue
+                for other in range(2, len(clause)):
+                    if values[num_vars + clause[other]] != -1:
+                        clause[1], clause[other] = clause[other], clause[1]
+                        watches[num_vars + clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if values[num_vars + clause[0]] == -1:
+                        kept.extend(watchers[position + 1:])
+                        watches[num_vars + false_literal] = kept
+                        return index
+                    assign(clause[0], index)
+            watches[num_vars + false_literal] = kept
+        return None
+
+    def analyze(conflict):
+        # resolve backwards along the trail until a single literal of the
+        # current level is left, the first unique implication point
+        seen = set()
+        learnt = [None]
+        current = len(trail_limits)
+        pending = 0
+        position = len(trail) - 1
+        implied = None
+        clause = database[conflict]
+        while True:
+            for literal in clause:
+                variable = abs(literal)
+                if literal == implied or variable in seen \
+                        or levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                bump(variable)
+                if levels[variable] == current:
+                    pending += 1
+                else:
+                    learnt.append(literal)
+            while abs(trail[position]) not in seen:
+                position -= 1
+            implied = trail[position]
+            position -= 1
+            pending -= 1
+            if not pending:
+                break
+            clause = database[reasons[abs(implied)]]
+        learnt[0] = -implied
+
+        # drop the literals implied by the other literals of the clause
+        learnt[1:] = [
+            literal for literal in learnt[1:]
+            if reasons[abs(literal)] is None
+            or any(abs(other) not in seen and levels[abs(other)] > 0
+                   for other in database[reasons[abs(literal)]]
+                   if other != -literal)]
+
+        level = 0
+        if len(learnt) > 1:
+            deepest = max(range(1, len(learnt)),
+                          key=lambda i: levels[abs(learnt[i])])
+            learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+            level = levels[abs(learnt[1])]
+        return learnt, level
+
+    conflicts = 0
+    restarts = 0
+    until_restart = _RESTART_INTERVAL
+    head = 0
+    while True:
+        conflict = propagate(head)
+        head = len(trail)
+        if conflict is None:
+            if until_restart <= 0:
+                restarts += 1
+                until_restart = _RESTART_INTERVAL * _luby(restarts + 1)
+                backtrack(0)
+                head = len(trail)
+            variable = None
+            while order:
+                _, candidate = heapq.heappop(order)
+                if values[num_vars + candidate] == 0:
+                    variable = candidate
+                    break
+            if variable is None:
+                return True
+            trail_limits.append(len(trail))
+            assign(variable * phases[variable], None)
+            continue
+
+        if not trail_limits:
+            return False
+        conflicts += 1
+        until_restart -= 1
+        if max_conflicts is not None and conflicts > max_conflicts:
+            return None
+        if limits is not None:
+            reason = limits.charge(1)
+            if reason is not None:
+                return Unknown(reason)
+        learnt, level = analyze(conflict)
+        increment /= 0.95
+        backtrack(level)
+        if len(order) > 4 * num_vars:
+            order = [(-activity[v], v)
+                     for v in range(1, num_vars + 1)
+                     if values[num_vars + v] == 0]
+            heapq.heapify(order)
+        head = len(trail)
+        if len(learnt) == 1:
+            assign(learnt[0], None)
+        else:
+            watch(learnt)
+            assign(learnt[0], len(database) - 1)
+
+
+def _flatten_clause(clause):
+    # every non-variable term becomes a fresh variable defined by a
+    # negative literal f(x1, ..., xn) != y, so all atoms are shallow
+    indices = dict()
+    atoms = []
+    definitions = []
+
+    def flatten(term):
+        index = indices.get(term)
+        if index is not None:
+            return index
+        if isinstance(term, str):
+            index = indices[term] = len(indices)
+            return index
+        arguments = tuple(flatten(argument) for argument in term[1])
+        index = indices[term] = len(indices)
+        definitions.append((term[0], arguments, index))
+        return index
+
+    for literal in clause:
+        negated = literal[0] == 'NOT'
+        predicate, arguments = literal[1] if negated else literal
+        atoms.append((negated, predicate,
+                      tuple(flatten(argument) for argument in arguments)))
+
+    return len(indices), atoms, definitions
+
+
+class _ModelSearch:
+    """Finite model search over growing domain sizes, as in Paradox."""
+
+    __slots__ = ('flat_clauses', 'functions', 'size', 'max_ground_clauses')
+
+    def __init__(self, clauses, max_ground_clauses=20000):
+        self.flat_clauses = [_flatten_clause(clause) for clause in clauses]
+        # a name used with two arities is two functions
+        self.functions = set()
+        for _, _, definitions in self.flat_clauses:
+            for fun, arguments, _ in definitions:
+                self.functions.add((fun, len(arguments)))
+        self.size = 1
+        self.max_ground_clauses = max_ground_clauses
+
+    def ground_size(self):
+        """Count the ground clauses for the next domain size."""
+        size = self.size
+        return (sum(size ** num_vars for num_vars, _, _ in self.flat_clauses)
+                + sum(size ** arity for _, arity in self.functions))
+
+    def fits(self):
+        """Check whether the next domain size is small enough to ground."""
+        return self.ground_size() <= self.max_ground_clauses
+
+    def step(self, max_conflicts=None, limits=None):
+        """Look for a model with the next domain size.
+
+        Returns True when one is found and False when there is none of
+        this size, in which case the size grows.
+        Returns None after max_conflicts conflicts, or an Unknown result
+        once the limits are hit.
+        """
+        if limits is None:
+            limits = Limits()
+        size = self.size
+        ids = dict()
+
+        def var(key):
+            return ids.setdefault(key, len(ids) + 1)
+
+        ground_clauses = []
+        for fun, arity in self.functions:
+            for arguments in product(range(size), repeat=arity):
+                ground_clauses.append([var((fun, arguments, value))
+                                       for value in range(size)])
+
+        # symmetry breaking: the i-th constant is one of the first i elements
+        constants = sorted(fun for fun, arity in self.functions
+                           if arity == 0)
+        for position, constant in enumerate(constants):
+            for value in range(position + 1, size):
+                ground_clauses.append([-var((constant, (), value))])
+
+        for num_vars, atoms, definitions in self.flat_clauses:
+            for values in product(range(size), repeat=num_vars):
+                reason = limits.charge()
+                if reason is not None:
+                    return Unknown(reason)
+                ground = [
+                    -var((fun, tuple(values[a] for a in arguments),
+                          values[result]))
+                    for fun, arguments, result in definitions]
+                for negated, predicate, arguments in atoms:
+                    atom = var((predicate,
+                                tuple(values[a] for a in arguments)))
+                    ground.append(-atom if negated else atom)
+                ground_clauses.append(ground)
+
+        result = satisfiable(ground_clauses, len(ids), max_conflicts, limits)
+        if result is False:
+            self.size += 1
+        return result
+
+
+def find_model(clauses, max_size=None, max_ground_clauses=20000):
+    """Find the size of the smallest finite model of the clauses, or None.
+
+    A model proves the clauses consistent.
+    """
+    search = _ModelSearch(clauses, max_ground_clauses)
+    while (max_size is None or search.size <= max_size) and search.fits():
+        if search.step():
+            return search.size
+    return None
+
+
+def _predicate(literal):
+    return literal[1][0] if literal[0] == 'NOT' else literal[0]
+
+
+def split_components(clauses):
+    """Split the clauses into groups sharing no predicate symbols.
+
+    The clauses are inconsistent iff one of the groups is.
+    """
+    parents = dict()
+
+    def find(predicate):
+        root = predicate
+        while parents[root] != root:
+            root = parents[root]
+        while parents[predicate] != root:
+            parents[predicate], predicate = root, parents[predicate]
+        return root
+
+    for clause in clauses:
+        roots = set()
+        for literal in clause:
+            predicate = _predicate(literal)
+            parents.setdefault(predicate, predicate)
+            roots.add(find(predicate))
+        root = min(roots, default=None)
+        for other in roots:
+            parents[other] = root
+
+    components = dict()
+    for clause in clauses:
+        # the empty clause is a component of its own
+        key = find(_predicate(next(iter(clause)))) if clause else None
+        components.setdefault(key, set()).add(clause)
+
+    return [frozenset(component) for component in components.values()]
+
+
+def _is_trivially_satisfiable(clauses):
+    # without a positive clause, making every atom false is a model,
+    # and without a negative clause, making every atom true is
+    has_positive = has_negative = False
+    for clause in clauses:
+        signs = {literal[0] == 'NOT' for literal in clause}
+        has_positive = has_positive or True not in signs
+        has_negative = has_negative or False not in signs
+    return not (has_positive and has_negative)
+
+
+def is_ground(clauses):
+    """Check whether the clauses are free of variables."""
+    for clause in clauses:
+        for literal in clause:
+            term_stack = [literal[1] if literal[0] == 'NOT' else literal]
+            while term_stack:
+                term = term_stack.pop()
+                if isinstance(term, str):
+                    return False
+                term_stack.extend(term[1])
+    return True
+
+
+def _decide_ground(limits, clauses, max_conflicts=None):
+    # the atoms of ground clauses are propositional variables
+    numbers = dict()
+    int_clauses = []
+    for clause in clauses:
+        int_clause = []
+        for literal in clause:
+            negated = literal[0] == 'NOT'
+            number = numbers.setdefault(literal[1] if negated else literal,
+                                        len(numbers) + 1)
+            int_clause.append(-number if negated else number)
+        int_clauses.append(int_clause)
+    result = satisfiable(int_clauses, len(numbers), max_conflicts, limits)
+    if result is None:
+        return Unknown('conflicts')
+    if isinstance(result, Unknown):
+        return result
+    return not result
+
+
+def is_horn(clauses):
+    """Check whether every clause has at most one positive literal."""
+    return all(sum(literal[0] != 'NOT' for literal in clause) <= 1
+               for clause in clauses)
+
+
+def _decide_ground_horn(clauses):
+    # Dowling-Gallier: count the body atoms of each clause not yet known to
+    # be true, and when that drops to zero, its head becomes true, or the
+    # clauses are inconsistent if it has none
+    heads = []
+    pending = []
+    watchers = dict()
+    facts = []
+    for clause in clauses:
+        head = None
+        body = set()
+        for literal in clause:
+            if literal[0] == 'NOT':
+                body.add(literal[1])
+            else:
+                head = literal
+        if not body:
+            if head is None:
+                return True
+            facts.append(head)
+            continue
+        for atom in body:
+            watchers.setdefault(atom, []).append(len(heads))
+        heads.append(head)
+        pending.append(len(body))
+
+    true_atoms = set()
+    while facts:
+        atom = facts.pop()
+        if atom in true_atoms:
+            continue
+        true_atoms.add(atom)
+        for index in watchers.get(atom, ()):
+            pending[index] -= 1
+            if not pending[index]:
+                if heads[index] is None:
+                    return True
+                facts.append(heads[index])
+    return False
+
 
+def _decide_horn(limits, clauses, max_facts=None):
+    # semi-naive forward chaining: every round matches the bodies of the
+    # rules against the facts with at least one of the facts derived in
+    # the previous round, so no match is repeated, and clauses without a
+    # positive literal are goals whose match is a refutation
+    rules = []
+    known = set()
+    old = dict()
+    delta = dict()
+    for clause in clauses:
+        body = [literal for literal in clause if literal[0] == 'NOT']
+        if body:
+            rules.append((body, [literal for literal in clause
+                                 if literal[0] != 'NOT']))
+            continue
+        if not clause:
+            return True
+        fact = canonical_clause(clause)
+        if fact not in known:
+            known.add(fact)
+            delta.setdefault(_predicate(next(iter(fact))), []).append(fact)
+
+    derived = 0
+    dropped = limits.dropped
+    while delta:
+        new = dict()
+        for body, head in rules:
+            for position, literal in enumerate(body):
+                predicate = _predicate(literal)
+                if predicate not in delta:
+                    continue
+
+                def facts(other, position=position):
+                    other_position = body.index(other)
+                    other_predicate = _predicate(other)
+                    if other_position == position:
+                        return delta[other_predicate]
+                    if other_position < position:
+                        return old.get(other_predicate, ())
+                    return chain(old.get(other_predicate, ()),
+                                 delta.get(other_predicate, ()))
+
+                try:
+                    for resolvent in _clash(body, head, facts):
+                        if not resolvent:
+                            return True
+                        resolvent = canonical_clause(resolvent)
+                        reason = limits.charge(1)
+                        if reason is not None:
+                            return Unknown(reason)
+                        if resolvent in known:
+                            continue
+                        derived += 1
+                        if max_facts is not None and derived > max_facts:
+                            return Unknown('given clauses')
+                        known.add(resolvent)
+                        new.setdefault(_predicate(next(iter(resolvent))),
+                                       []).append(resolvent)
+                except RecursionError:
+                    # too deep to build, which makes the search incomplete
+                    limits.dropped += 1
+        for predicate, facts in delta.items():
+            old.setdefault(predicate, []).extend(facts)
+        delta = new
+    if limits.dropped > dropped:
+        return Unknown('incomplete', limits.dropped - dropped)
     return False
 
 
-def timeout(fn, seconds):
-    done = multiprocessing.Event()
-    result_queue = multiprocessing.Queue(maxsize=1)
+def _term_symbols(term, symbols):
+    term_stack = [term]
+    while term_stack:
+        term = term_stack.pop()
+        if not isinstance(term, str):
+            symbols.add(term[0])
+            term_stack.extend(term[1])
+
+
+def clause_symbols(clause):
+    """Collect the predicate and function symbols of the clause."""
+    symbols = set()
+    for literal in clause:
+        _term_symbols(literal[1] if literal[0] == 'NOT' else literal, symbols)
+    return symbols
+
 
-    def queued_fn():
-        result_queue.put_nowait(fn(done))
-    process = multiprocessing.Process(group=None, target=queued_fn)
-    process.start()
+def relevant_subset(clauses, seeds, tolerance=1.5, depth=None):
+    """Select the clauses relevant to the seeds, as in SInE.
+
+    A symbol triggers the clauses in which it is among the rarest symbols,
+    within a factor of tolerance.
+    Starting from the symbols of the seeds, triggered clauses are selected
+    and their symbols trigger further clauses, up to depth rounds.
+    """
+    clause_symbol_sets = {clause: clause_symbols(clause) for clause in clauses}
+    occurrences = Counter(chain.from_iterable(clause_symbol_sets.values()))
+
+    triggers = dict()
+    for clause, symbols in clause_symbol_sets.items():
+        if not symbols:
+            continue
+        rarest = min(occurrences[symbol] for symbol in symbols)
+        for symbol in symbols:
+            if occurrences[symbol] <= tolerance * rarest:
+                triggers.setdefault(symbol, []).append(clause)
+
+    selected = set(seeds)
+    frontier = set()
+    for seed in seeds:
+        frontier |= clause_symbol_sets.get(seed) or clause_symbols(seed)
+    seen = set(frontier)
+    while frontier and (depth is None or depth > 0):
+        if depth is not None:
+            depth -= 1
+        new_symbols = set()
+        for symbol in frontier:
+            for clause in triggers.get(symbol, ()):
+                if clause not in selected:
+                    selected.add(clause)
+                    new_symbols |= clause_symbol_sets[clause]
+        frontier = new_symbols - seen
+        seen |= frontier
+
+    return frozenset(selected)
+
+
+_RELEVANCE_MIN_CLAUSES = 32
+_MODEL_SIZES_PER_ROUND = 4
+_PARALLEL_MIN_CLAUSES = 128
+
+
+def _decide_component(limits, clauses, max_given=None, rule='binary',
+                      ordering=None, processes=None):
+    if is_horn(clauses):
+        if is_ground(clauses):
+            return _decide_ground_horn(clauses)
+        return _decide_horn(limits, clauses, max_given)
+    if is_ground(clauses):
+        return _decide_ground(limits, clauses, max_given)
+    if len(clauses) >= _RELEVANCE_MIN_CLAUSES:
+        # every refutation uses a clause without positive literals
+        seeds = [clause for clause in clauses
+                 if all(literal[0] == 'NOT' for literal in clause)]
+        subset = relevant_subset(clauses, seeds)
+        if len(subset) < len(clauses):
+            result = find_contradiction(
+                subset, limits, max_given=max_given or len(subset) ** 2,
+                rule=rule, ordering=ordering, processes=processes)
+            if result or (isinstance(result, Unknown)
+                          and result.reason not in _BUDGET_REASONS):
+                return result
+    result = find_contradiction(clauses, limits, max_given=max_given,
+                                rule=rule, ordering=ordering,
+                                processes=processes)
+    if rule == 'ur' and result == Unknown('incomplete'):
+        # unit-resulting resolution ran out of inferences, which proves
+        # nothing, so fall back to binary resolution
+        return find_contradiction(clauses, limits, max_given=max_given)
+    return result
+
+
+def _decide_fairly(limits, components, found=None, rule='binary',
+                   ordering=None, processes=None):
+    # share the time between the components by alternating a model search
+    # of growing size with a resolution search with a growing budget
+    pending = [(component,
+                None if is_ground(component) else _ModelSearch(component))
+               for component in components]
+    budget = 64
+    while pending:
+        undecided = []
+        for component, model_search in pending:
+            has_model = False
+            # small domains are cheap, so try a few of them per round
+            for _ in range(_MODEL_SIZES_PER_ROUND):
+                if model_search is not None and not model_search.fits():
+                    model_search = None
+                if model_search is None:
+                    break
+                cheap = model_search.ground_size() <= 16 * budget
+                has_model = model_search.step(budget, limits)
+                if has_model is not False or not cheap:
+                    break
+            if has_model:
+                continue
+            if isinstance(has_model, Unknown):
+                return has_model
+            result = _decide_component(limits, component, budget, rule,
+                                       ordering, processes)
+            if result:
+                return True
+            if not isinstance(result, Unknown):
+                continue
+            if result.reason not in _BUDGET_REASONS:
+                return result
+            undecided.append((component, model_search))
+        if found is not None and found.is_set():
+            return True
+        pending = undecided
+        budget *= 4
+    return False
+
+
+def _nontrivial_components(clauses):
+    return [component for component in split_components(clauses)
+            if not _is_trivially_satisfiable(component)]
+
+
+def _component_target(clauses, limits, found, connection, rule, ordering,
+                      processes):
+    try:
+        result = _decide_fairly(limits, [clauses], rule=rule,
+                                ordering=ordering, processes=processes)
+    except MemoryError:
+        result = Unknown('memory')
+    except RecursionError:
+        result = Unknown('recursion')
+    if result:
+        found.set()
+    connection.send(result)
+
+
+def is_inconsistent(formulae, limits=None, rule='binary', ordering=None,
+                    processes=None):
+    """Decide whether the formulae (or a CompiledSet) are inconsistent.
+
+    The rule and ordering select the inference rule of find_contradiction,
+    and with processes, each resolution search runs in that many
+    processes.
+    Returns True or False, or an Unknown result once the limits are hit.
+    """
+    if limits is None:
+        limits = Limits()
+    components = _nontrivial_components(clause_set(formulae))
+    large = [component for component in components
+             if len(component) >= _PARALLEL_MIN_CLAUSES]
+    if len(large) < 2:
+        large = []
+
+    found = multiprocessing.Event()
+    workers = []
+    connections = []
     try:
-        return result_queue.get(block=True, timeout=seconds)
-    except queue.Empty:
-        done.set()
-        return result_queue.get()
+        for component in large:
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(group=None,
+                                              target=_component_target,
+                                              args=(component, limits, found,
+                                                    sender, rule, ordering,
+                                                    processes))
+            process.start()
+            workers.append(process)
+            connections.append(receiver)
 
+        result = _decide_fairly(limits, [component for component in components
+                                         if component not in large], found,
+                                rule, ordering, processes)
+        if result or isinstance(result, Unknown):
+            return result
 
-def is_inconsistent(done, formulae):
-    cnf = set()
-    for formula in formulae:
-        cnf |= str_to_cnf(formula)
-    return find_contradiction(done, cnf)
+        while workers and not found.wait(0.01):
+            if not any(process.is_alive() for process in workers):
+                break
+        if found.is_set():
+            return True
+        for connection in connections:
+            # a worker killed by its resource limits reports nothing
+            result = connection.recv() if connection.poll() \
+                else Unknown('exited')
+            if isinstance(result, Unknown):
+                return result
+        return False
+    finally:
+        for process in workers:
+            process.terminate()
+            process.join()
+
+
+# clauses a ProverSession selects before deciding like is_inconsistent
+_HEAD_START_GIVEN = 64
+
+
+class ProverSession:
+    """Clause set that grows incrementally and rolls back to snapshots.
+
+    Load and saturate a background theory once, then check any number of
+    goal formula lists against it; each check is undone afterwards.
+    """
+
+    __slots__ = ('clauses', '_members', '_variants', '_passive', '_derived',
+                 '_given', '_marks')
+
+    def __init__(self, formulae=()):
+        self.clauses = []
+        self._members = set()
+        self._variants = Counter()
+        self._passive = set()
+        self._derived = set()
+        self._given = []
+        self._marks = []
+        self.add(formulae)
+
+    def add(self, formulae):
+        """Add the CNF of a formula list or CompiledSet to the session."""
+        for clause in clause_set(formulae):
+            self._add(clause)
+
+    def _add(self, clause):
+        if clause not in self._members:
+            self._members.add(clause)
+            self._variants[canonical_clause(clause)] += 1
+            self._passive.add(clause)
+            self.clauses.append(clause)
+
+    def push(self):
+        """Snapshot the session so that pop() can restore it."""
+        self._marks.append((len(self.clauses), len(self._given)))
+
+    def pop(self):
+        """Restore the session to the most recent snapshot."""
+        num_clauses, num_given = self._marks.pop()
+        for clause in self.clauses[num_clauses:]:
+            self._members.discard(clause)
+            variant = canonical_clause(clause)
+            self._variants[variant] -= 1
+            if not self._variants[variant]:
+                del self._variants[variant]
+            self._passive.discard(clause)
+            self._derived.discard(clause)
+        del self.clauses[num_clauses:]
+        for clause in self._given[num_given:]:
+            if clause in self._members:
+                self._passive.add(clause)
+        del self._given[num_given:]
+
+    def saturate(self, limits=None, max_clauses=1000, max_weight=64):
+        """Resolve the passive clauses against the session.
+
+        Stops when no passive clauses remain, max_clauses resolvents have
+        been added, or the limits are hit.
+        Resolvents weighing more than max_weight are not kept, and their
+        parents stay passive so that check() still resolves them.
+        Returns whether the session is known to be inconsistent.
+        """
+        if limits is None:
+            limits = Limits()
+        clause_heap = [(len(c), clause_weight(c), c) for c in self._passive]
+        heapq.heapify(clause_heap)
+        added = 0
+        while (clause_heap and added < max_clauses
+               and frozenset() not in self._members):
+            _, _, left_clause = heapq.heappop(clause_heap)
+            complete = True
+            for right_clause in list(self.clauses):
+                if limits.charge() is not None:
+                    return frozenset() in self._members
+                resolvent = resolve(left_clause, right_clause)
+                if (resolvent is None
+                        or canonical_clause(resolvent) in self._variants):
+                    continue
+                weight = clause_weight(resolvent)
+                if weight > max_weight:
+                    complete = False
+                    continue
+                self._add(resolvent)
+                self._derived.add(resolvent)
+                heapq.heappush(clause_heap,
+                               (len(resolvent), weight, resolvent))
+                added += 1
+            if complete:
+                self._passive.discard(left_clause)
+                self._given.append(left_clause)
+
+        return frozenset() in self._members
+
+    def check(self, formulae, limits=None):
+        """Decide whether the session plus the formulae is inconsistent.
+
+        The saturated session is a head start: a short search from the
+        passive clauses and the new formulae, which never selects the
+        clauses saturation already selected, often refutes them at once.
+        Otherwise the input clauses are decided like is_inconsistent does,
+        component by component.
+        """
+        if limits is None:
+            limits = Limits()
+        if frozenset() in self._members:
+            return True
+
+        self.push()
+        try:
+            self.add(formulae)
+            result = find_contradiction(self.clauses, limits,
+                                        support=list(self._passive),
+                                        max_given=_HEAD_START_GIVEN)
+            if result or (isinstance(result, Unknown)
+                          and result.reason not in _BUDGET_REASONS):
+                return result
+            # the derived clauses only make the other engines slower
+            return _decide_fairly(limits, _nontrivial_components(
+                [clause for clause in self.clauses
+                 if clause not in self._derived]))
+        finally:
+            self.pop()
+
+
+def shared_prefixes(fSets):  # noqa
+    """Group formula lists by the leading formulae they share.
+
+    Returns a dict from each shared prefix (a tuple of formulae) to the
+    indices of the formula lists starting with it.
+    Lists sharing no prefix with any other list are left out.
+    """
+    order = sorted(range(len(fSets)), key=lambda i: list(fSets[i]))
+    common = [0] * len(order)
+    for previous, current in zip(order, order[1:]):
+        length = 0
+        for left, right in zip(fSets[previous], fSets[current]):
+            if left != right:
+                break
+            length += 1
+        common[previous] = max(common[previous], length)
+        common[current] = max(common[current], length)
+
+    groups = dict()
+    for index in order:
+        if common[index]:
+            prefix = tuple(fSets[index][:common[index]])
+            groups.setdefault(prefix, []).append(index)
+
+    return {prefix: indices
+            for prefix, indices in groups.items() if len(indices) > 1}
+
+
+def _worker_limits(time_limit):
+    # one exploding problem must not take the memory of the whole host
+    try:
+        max_bytes = (os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+                     // multiprocessing.cpu_count())
+    except (AttributeError, ValueError, OSError):
+        max_bytes = None
+
+    if max_bytes is not None and resource is not None:
+        # the address space exceeds the resident size, so leave some room
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        ceiling = 2 * max_bytes
+        if hard != resource.RLIM_INFINITY:
+            ceiling = min(ceiling, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (ceiling, hard))
+        except (ValueError, OSError):
+            pass
+
+    return Limits(deadline=time.monotonic() + time_limit,
+                  max_bytes=max_bytes)
+
+
+def _check_target(formulae, event, time_limit):
+    try:
+        if is_inconsistent(formulae, _worker_limits(time_limit)):
+            event.set()
+    except (MemoryError, RecursionError):
+        pass
+
+
+def _session_check_target(session, goals, event, limits):
+    try:
+        if session.check(goals, limits):
+            event.set()
+    except (MemoryError, RecursionError):
+        pass
+
+
+def _session_target(background, goal_sets, events, time_limit):
+    limits = _worker_limits(time_limit)
+    session = ProverSession(background)
+    try:
+        session.saturate(Limits(deadline=time.monotonic() + time_limit / 4,
+                                max_bytes=limits.max_bytes))
+    except (MemoryError, RecursionError):
+        pass
+
+    processes = []
+    for goals, event in zip(goal_sets, events):
+        try:
+            process = multiprocessing.Process(group=None,
+                                              target=_session_check_target,
+                                              args=(session, goals, event,
+                                                    limits))
+            process.start()
+            processes.append(process)
+        except:  # noqa
+            continue
+
+    for process in processes:
+        process.join()
+
+
+def _pool_check_target(formulae, event, time_limit):
+    if hasattr(os, 'setpgrp'):
+        # lead a process group so that cancelling kills the whole tree
+        os.setpgrp()
+    _check_target(formulae, event, time_limit)
+
+
+def _kill(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        process.terminate()
+
+
+class WorkerPool:
+    """Bounded set of prover processes shared by concurrent asyncio batches.
+
+    At most `processes` formula sets are checked at once.
+    Cancelling the task awaiting a check kills its processes.
+    """
+
+    __slots__ = ('processes', '_slots')
+
+    def __init__(self, processes=None):
+        self.processes = processes or multiprocessing.cpu_count()
+        self._slots = None
+
+    async def check(self, formulae, time_limit):
+        """Decide whether the formulae are inconsistent without blocking."""
+        if self._slots is None:
+            # created lazily so that it binds to the running event loop
+            self._slots = asyncio.Semaphore(self.processes)
+
+        async with self._slots:
+            event = multiprocessing.Event()
+            process = multiprocessing.Process(group=None,
+                                              target=_pool_check_target,
+                                              args=(formulae, event,
+                                                    time_limit))
+            process.start()
+            try:
+                await asyncio.get_event_loop().run_in_executor(
+                    None, process.join)
+            except asyncio.CancelledError:
+                _kill(process)
+                raise
+            return event.is_set()
+
+
+_default_pool = None
+
+
+class _InconsistentSets:
+    """Async iterator over the indices of inconsistent formula sets.
+
+    Indices are produced as their checks complete.
+    """
+
+    __slots__ = ('f_sets', 'pool', 'deadline', '_tasks', '_ready')
+
+    def __init__(self, f_sets, pool, deadline):
+        self.f_sets = f_sets
+        self.pool = pool
+        self.deadline = deadline
+        self._tasks = None
+        self._ready = []
+
+    def __aiter__(self):
+        return self
+
+    def _start(self):
+        loop = asyncio.get_event_loop()
+        if self.deadline is None:
+            self.deadline = loop.time() + 600
+        num_sets = len(self.f_sets)
+        time_limit = (self.deadline - loop.time()) * min(
+            1, self.pool.processes / max(num_sets, 1))
+        self._tasks = {
+            asyncio.ensure_future(self.pool.check(formulae, time_limit)):
+            index
+            for index, formulae in enumerate(self.f_sets)}
+
+    async def __anext__(self):
+        if self._tasks is None:
+            self._start()
+
+        loop = asyncio.get_event_loop()
+        while not self._ready:
+            if not self._tasks:
+                raise StopAsyncIteration
+            try:
+                finished, _ = await asyncio.wait(
+                    self._tasks,
+                    timeout=max(self.deadline - loop.time(), 0),
+                    return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                self.cancel()
+                raise
+            if not finished:
+                self.cancel()
+                raise StopAsyncIteration
+            for task in finished:
+                index = self._tasks.pop(task)
+                if (not task.cancelled() and task.exception() is None
+                        and task.result()):
+                    self._ready.append(index)
+            self._ready.sort(reverse=True)
+
+        return self._ready.pop()
+
+    def cancel(self):
+        """Stop checking the formula sets, killing their processes."""
+        for task in self._tasks or ():
+            task.cancel()
+        self._tasks = dict()
+
+    async def aclose(self):
+        """Cancel the batch and wait for its processes to be killed."""
+        tasks = list(self._tasks or ())
+        self.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def find_inconsistent_async(fSets, *, deadline=None, pool=None):  # noqa
+    """Find indices of inconsistent formula lists from asyncio code.
+
+    Returns an async iterator over the indices, in the order the checks
+    complete, so ``async for index in find_inconsistent_async(fSets)``
+    never blocks the event loop.
+    The deadline is a time on the event loop clock, by default 600 seconds
+    from the first iteration.
+    Batches share the given WorkerPool, or a default one.
+    """
+    global _default_pool  # pylint: disable=global-statement
+    if pool is None:
+        if _default_pool is None:
+            _default_pool = WorkerPool()
+        pool = _default_pool
+    return _InconsistentSets(fSets, pool, deadline)
 
 
 def findIncSet(fSets):  # noqa
@@ -493,7 +2753,7 @@ def findIncSet(fSets):  # noqa
     finds the zero-indexed indices of inconsistent lists of formulas.
     See README.md for detailed specification.
 
-    :param fSets: list of formula lists
+    :param fSets: list of formula lists, or a CompiledSets cache
     :return: returns the list of inconsistent zero-indexed indices
     """
     result = []
@@ -504,29 +2764,48 @@ def findIncSet(fSets):  # noqa
         return list(result)
 
     time_limit = 600 / num_sets
+    # every batch interns into a fresh table, which the workers inherit
+    _SYMBOLS.clear()
 
-    problems = []
-    for formulae in fSets:
+    events = [multiprocessing.Event() for _ in range(num_sets)]
+    processes = []
+
+    grouped = set()
+    if not isinstance(fSets, CompiledSets):
+        for prefix, indices in shared_prefixes(fSets).items():
+            try:
+                process = multiprocessing.Process(
+                    group=None,
+                    target=_session_target,
+                    args=(prefix,
+                          [fSets[i][len(prefix):] for i in indices],
+                          [events[i] for i in indices],
+                          time_limit))
+                process.start()
+                processes.append(process)
+                grouped.update(indices)
+            except:  # noqa
+                continue
+
+    for index, formulae in enumerate(fSets):
+        if index in grouped:
+            continue
         try:
-            def target(formulae, event):
-                if timeout(lambda done: is_inconsistent(done, formulae),
-                           time_limit):
-                    event.set()
-            event = multiprocessing.Event()
             process = multiprocessing.Process(group=None,
-                                              target=target,
-                                              args=(formulae, event))
+                                              target=_check_target,
+                                              args=(formulae, events[index],
+                                                    time_limit))
             process.start()
-            problems.append((process, event))
+            processes.append(process)
         except:  # noqa
             continue
 
-    for index, (process, event) in enumerate(problems):
+    for process in processes:
         try:
             process.join()
-            if event.is_set():
-                result.append(index)
         except:  # noqa
             continue
 
+    result.extend(index for index, event in enumerate(events)
+                  if event.is_set())
     return result
@@ -1,6 +1,9 @@
 """Test p2.py"""
 
+import asyncio
+import itertools
 import random
+import time
 
 import pytest
 
@@ -90,6 +93,56 @@ def test_str_to_cnf(s, cnf):
     assert p2.str_to_cnf(s) == cnf
 
 
+def test_str_to_cnf_deep():
+    depth = 5000
+    conjunction = '(AND (p a) ' * depth + '(q a)' + ')' * depth
+    assert p2.str_to_cnf(conjunction) == frozenset({
+        frozenset({('p', (('a', ()),))}), frozenset({('q', (('a', ()),))})})
+    negations = '(NOT ' * (depth + 1) + '(p a)' + ')' * (depth + 1)
+    assert p2.str_to_cnf(negations) == frozenset({
+        frozenset({('NOT', ('p', (('a', ()),)))})})
+    term = '(p ' + '(s ' * depth + '0' + ')' * depth + ')'
+    (clause,) = p2.str_to_cnf(term)
+    assert p2.clause_weight(clause) == depth + 2
+
+
+@pytest.mark.parametrize('s', [
+    '(AND (p a))',
+    '(OR (p a) q)',
+    '(p (f a)',
+    '(p (( a)))',
+])
+def test_str_to_cnf_errors(s):
+    with pytest.raises(p2.ParseError):
+        p2.str_to_cnf(s)
+
+
+def test_symbol_table():
+    symbols = p2.SymbolTable()
+    first = p2.str_to_cnf('(AND (p a (f a)) (EXISTS y (FORALL x (q x y))))',
+                          symbols)
+    second = p2.str_to_cnf('(FORALL x (OR (q x b) (p (f b) b)))', symbols)
+    terms = [term for cnf in (first, second) for clause in cnf
+             for atom in clause for term in atom[1]]
+    constants = [term for term in terms if term == ('b', ())]
+    constants.extend(term[1][0] for term in terms if term == ('f', ('b',)))
+    assert len(constants) == 2
+    assert all(term is constants[0] for term in constants)
+    assert symbols.constant('a') is symbols.constant('a')
+    assert symbols.skolem('y', ()) is symbols.skolem('y', ())
+    # arguments are registered before the symbol applied to them
+    assert [symbols.id('a', 'constant'), symbols.id('f', 'function', 1),
+            symbols.id('p', 'predicate', 2)] == [0, 1, 2]
+    assert symbols.role(symbols.skolem('y', ())) == 'skolem'
+    assert symbols.role(symbols.constant('a')) == 'constant'
+    assert ('q', 'predicate', 2) in symbols.ids
+    assert sorted(symbols.ids.values()) == list(range(len(symbols)))
+    symbols.clear()
+    assert len(symbols) == 0
+    assert p2.str_to_cnf('(p a (f a))', symbols) == first - {
+        frozenset({('q', ('x', ('y', ())))})}
+
+
 @pytest.mark.parametrize('substitutions, term, result', [
     ({'x': 'a'}, ('P', ('a',)), ('P', ('a',))),
     ({'x': 'a'}, ('P', ('x',)), ('P', ('a',))),
@@ -114,6 +167,20 @@ def test_substitute(substitutions, term, result):
 # ('f', (('a', (('b', ()),)), 'y')) = f(a(b()), y) (by the way, y is a var) = FUNCTION f (FUNCTION a (FUNCTION b ()), VARIABLE y)
 
 
+@pytest.mark.parametrize('clause, canonical', [
+    (frozenset({('p', ('x', ('a', ())))}),
+     frozenset({('p', ('_0', ('a', ())))})),
+    (frozenset({('NOT', ('q', ('y', 'x'))), ('p', (('f', ('x',)),))}),
+     frozenset({('NOT', ('q', ('_1', '_0'))), ('p', (('f', ('_0',)),))})),
+    (frozenset({('NOT', ('q', ('u', 'v'))), ('p', (('f', ('v',)),))}),
+     frozenset({('NOT', ('q', ('_1', '_0'))), ('p', (('f', ('_0',)),))})),
+    (frozenset({('p', (('a', ()),))}),
+     frozenset({('p', (('a', ()),))})),
+])
+def test_canonical_clause(clause, canonical):
+    assert p2.canonical_clause(clause) == canonical
+
+
 @pytest.mark.parametrize('first_term, second_term, result', [
     ('P', 'Q', ('P', 'Q')),
     (('f', ('x',)), 'x', (('f', ('x',)), 'x')),
@@ -154,7 +221,12 @@ def test_find_disagreement(first_term, second_term, result):
     ),
     (
         'x', ('f', ('x',)), None
-    )
+    ),
+    (
+        ('P', (('f', ('x',)), 'x')),
+        ('P', ('y', 'z')),
+        {'y': ('f', ('z',)), 'x': 'z'},
+    ),
 ])
 def test_unify(first_term, second_term, result):
     assert p2.unify(first_term, second_term) == result
@@ -244,21 +316,263 @@ def test_resolve(clause_one, clause_two, result):
     assert p2.resolve(clause_one, clause_two) == result
 
 
-def test_timeout_triggered():
-    num = random.random()
+NUCLEUS = frozenset({
+    ('NOT', ('p', ('x',))), ('NOT', ('q', ('y',))), ('r', ('x', 'y')),
+})
+
+
+@pytest.mark.parametrize('satellites, result', [
+    ([frozenset({('p', (('a', ()),))}), frozenset({('q', (('b', ()),))})],
+     {frozenset({('r', (('a', ()), ('b', ())))})}),
+    ([frozenset({('p', (('a', ()),))}),
+      frozenset({('q', ('x',)), ('s', ('x',))})],
+     {frozenset({('r', (('a', ()), '_0')), ('s', ('_0',))})}),
+    ([frozenset({('p', (('a', ()),))})], set()),
+    # every partner of a literal extends the same residue of the prefix
+    ([frozenset({('p', (('a', ()),)), ('s', ())}),
+      frozenset({('p', (('a', ()),)), ('t', ())}),
+      frozenset({('q', (('b', ()),)), ('u', ())}),
+      frozenset({('q', (('b', ()),)), ('v', ())})],
+     {frozenset({('r', (('a', ()), ('b', ()))), (s, ()), (u, ())})
+      for s in ('s', 't') for u in ('u', 'v')}),
+])
+def test_hyperresolve(satellites, result):
+    assert {p2.canonical_clause(resolvent) for resolvent
+            in p2.hyperresolve(NUCLEUS, satellites)} == result
+
+
+@pytest.mark.parametrize('units, result', [
+    ([frozenset({('p', (('a', ()),))}), frozenset({('q', (('b', ()),))})],
+     {frozenset({('r', (('a', ()), ('b', ())))})}),
+    ([frozenset({('p', (('a', ()),))}),
+      frozenset({('NOT', ('r', ('z', ('b', ()))))})],
+     {frozenset({('NOT', ('q', (('b', ()),)))})}),
+    ([frozenset({('p', (('a', ()),))}), frozenset({('q', (('b', ()),))}),
+      frozenset({('NOT', ('r', ('z', 'z')))})],
+     {frozenset({('r', (('a', ()), ('b', ())))}),
+      frozenset({('NOT', ('q', (('a', ()),)))}),
+      frozenset({('NOT', ('p', (('b', ()),)))})}),
+])
+def test_ur_resolve(units, result):
+    assert p2.ur_resolve(NUCLEUS, units) == result
+
+
+ANCESTORS = [
+    '(FORALL x (FORALL y (IMPLIES (parent x y) (anc x y))))',
+    '(FORALL x (FORALL y (FORALL z '
+    '(IMPLIES (AND (parent x y) (anc y z)) (anc x z)))))',
+] + ['(parent a{} a{})'.format(i, i + 1) for i in range(8)]
+
 
-    def compute(done):
-        while not done.is_set():
-            pass
-        return num
+@pytest.mark.parametrize('rule', ['hyper', 'ur'])
+def test_find_contradiction_rules(rule):
+    clauses = p2.clause_set(ANCESTORS + ['(NOT (anc a0 a8))'])
+    binary_limits, limits = p2.Limits(), p2.Limits()
+    assert p2.find_contradiction(clauses, binary_limits) is True
+    assert p2.find_contradiction(clauses, limits, rule=rule) is True
+    assert limits.generated < binary_limits.generated
 
-    assert p2.timeout(fn=compute, seconds=1) == num
+    clauses = p2.clause_set(ANCESTORS + ['(NOT (anc a8 a0))'])
+    result = p2.find_contradiction(clauses, rule=rule)
+    assert result is False if rule == 'hyper' else not result
 
 
-def test_timeout_untriggered():
-    num = random.random()
+def test_symbol_precedence():
+    clauses = p2.clause_set(['(FORALL x (p (f x) (f (g a))))', '(q b b)'])
+    assert p2.symbol_precedence(clauses) == {
+        'b': 0, 'a': 1, 'f': 2, 'g': 3, 'p': 4, 'q': 5}
 
-    assert p2.timeout(fn=lambda _: num, seconds=0.01) == num
+
+PRECEDENCE = {'a': 0, 'b': 1, 'f': 2, 'g': 3, 'p': 4, 'q': 5}
+
+
+@pytest.mark.parametrize('kind', ['kbo', 'lpo'])
+@pytest.mark.parametrize('left, right, greater', [
+    (('f', ('x',)), 'x', True),
+    ('x', ('f', ('x',)), False),
+    (('f', ('x',)), 'y', False),
+    (('g', ('x',)), ('f', ('x',)), True),
+    (('f', ('x',)), ('g', ('x',)), False),
+    (('f', (('b', ()),)), ('f', (('a', ()),)), True),
+    (('g', ('x', ('a', ()))), ('g', ('x', 'y')), False),
+    (('f', (('f', ('x',)),)), ('g', ('x',)), None),
+])
+def test_term_ordering(kind, left, right, greater):
+    ordering = p2.TermOrdering(PRECEDENCE, kind)
+    # a deeper term outweighs in KBO, a bigger head symbol wins in LPO
+    if greater is None:
+        greater = kind == 'kbo'
+    assert ordering.greater(left, right) is greater
+    assert not (greater and ordering.greater(right, left))
+
+
+@pytest.mark.parametrize('selection, eligible', [
+    ('none', {('q', (('f', ('x',)),))}),
+    ('negative', {('NOT', ('p', (('f', ('x',)),)))}),
+])
+def test_term_ordering_eligible(selection, eligible):
+    ordering = p2.TermOrdering(PRECEDENCE, selection=selection)
+    clause = frozenset({('NOT', ('p', ('x',))), ('q', (('f', ('x',)),)),
+                        ('NOT', ('p', (('f', ('x',)),)))})
+    assert ordering.eligible(clause) == eligible
+
+
+def test_ordered_resolve():
+    ordering = p2.TermOrdering(PRECEDENCE, selection='none')
+    left = frozenset({('p', ('x',)), ('q', ('x',))})
+    right = frozenset({('NOT', ('q', (('a', ()),)))})
+    assert p2.ordered_resolve(left, right, ordering) == {
+        frozenset({('p', (('a', ()),))})}
+    # p(x) is smaller than q(x), so it cannot be resolved upon
+    right = frozenset({('NOT', ('p', (('a', ()),)))})
+    assert p2.ordered_resolve(left, right, ordering) == set()
+    factors = p2.ordered_factors(
+        frozenset({('q', ('x',)), ('q', ('y',))}), ordering)
+    assert {p2.canonical_clause(factor) for factor in factors} == {
+        frozenset({('q', ('_0',))})}
+
+
+@pytest.mark.parametrize('kind', ['kbo', 'lpo'])
+def test_find_contradiction_ordered(kind):
+    clauses = p2.clause_set(ANCESTORS + ['(NOT (anc a0 a8))'])
+    ordering = p2.TermOrdering(p2.symbol_precedence(clauses), kind)
+    assert p2.find_contradiction(
+        clauses, rule='ordered', ordering=ordering) is True
+    # unlike the other rules, ordered resolution saturates consistent sets
+    assert p2.find_contradiction(p2.clause_set(
+        ANCESTORS + ['(NOT (anc a8 a0))']), rule='ordered') is False
+    # and with factoring, it refutes sets binary resolution cannot
+    clauses = p2.clause_set([
+        '(FORALL x (FORALL y (OR (p x) (p y))))',
+        '(FORALL x (FORALL y (OR (NOT (p x)) (NOT (p y)))))',
+    ])
+    assert p2.find_contradiction(clauses, rule='ordered') is True
+
+
+@pytest.mark.parametrize('rule', ['binary', 'ordered'])
+def test_find_contradiction_parallel(rule):
+    clauses = p2.clause_set(ANCESTORS + ['(NOT (anc a0 a8))'])
+    limits = p2.Limits()
+    assert p2.find_contradiction(clauses, limits, rule=rule,
+                                 processes=3) is True
+    assert limits.generated > 0
+    clauses = p2.clause_set(ANCESTORS + ['(NOT (anc a8 a0))'])
+    if rule == 'ordered':
+        assert p2.find_contradiction(clauses, rule=rule,
+                                     processes=3) is False
+    assert p2.find_contradiction(
+        clauses, rule=rule, max_given=6,
+        processes=3) == p2.Unknown('given clauses')
+    if rule == 'binary':
+        assert p2.find_contradiction(
+            clauses, p2.Limits(deadline=time.monotonic() + 0.5),
+            processes=3) == p2.Unknown('deadline')
+
+
+def test_find_contradiction_parallel_rules():
+    with pytest.raises(ValueError):
+        p2.find_contradiction(p2.clause_set(ANCESTORS), rule='hyper',
+                              processes=2)
+    assert p2.is_inconsistent(
+        arithmetic + ['(NOT (eq (plus {0} 0) {0}))'.format(peano(20))],
+        processes=2) is True
+
+
+@pytest.mark.parametrize('formulae, horn', [
+    (ANCESTORS, True),
+    (['(OR (p a) (q a))'], False),
+    (['(FORALL x (IMPLIES (p x) (AND (q x) (r x))))'], True),
+    (['(FORALL x (IMPLIES (p x) (OR (q x) (r x))))'], False),
+])
+def test_is_horn(formulae, horn):
+    assert p2.is_horn(p2.clause_set(formulae)) is horn
+
+
+def test_decide_horn():
+    chain = ['(p0)'] + ['(IMPLIES (p{}) (p{}))'.format(i, i + 1)
+                        for i in range(2000)]
+    clauses = p2.clause_set(chain + ['(NOT (p2000))'])
+    assert p2._decide_ground_horn(clauses) is True
+    assert p2._decide_ground_horn(p2.clause_set(chain)) is False
+    assert p2.is_inconsistent(chain + ['(NOT (p2000))']) is True
+
+    limits = p2.Limits()
+    clauses = p2.clause_set(ANCESTORS + ['(NOT (anc a0 a8))'])
+    assert p2._decide_horn(limits, clauses) is True
+    clauses = p2.clause_set(ANCESTORS + ['(NOT (anc a8 a0))'])
+    assert p2._decide_horn(limits, clauses) is False
+    # facts with variables
+    clauses = p2.clause_set(arithmetic)
+    assert p2.is_horn(clauses)
+    assert p2._decide_horn(limits, clauses) is False
+    # an infinite least model
+    clauses = p2.clause_set(
+        ['(p 0)', '(FORALL x (IMPLIES (p x) (p (s x))))'])
+    assert p2._decide_horn(limits, clauses, 100) == p2.Unknown(
+        'given clauses')
+    assert p2.is_inconsistent(ANCESTORS + ['(NOT (anc a8 a0))']) is False
+
+
+@pytest.mark.parametrize('rule', ['binary', 'hyper', 'ur', 'ordered'])
+def test_is_inconsistent_rules(rule):
+    assert p2.is_inconsistent(
+        ANCESTORS + ['(NOT (anc a0 a8))'], rule=rule) is True
+    assert p2.is_inconsistent(
+        arithmetic + ['(NOT (eq (plus {0} 0) {0}))'.format(peano(20))],
+        rule=rule) is True
+
+
+@pytest.mark.parametrize('limits, reason', [
+    (p2.Limits(max_clauses=10, check_interval=1), 'clauses'),
+    (p2.Limits(deadline=0), 'deadline'),
+    (p2.Limits(max_bytes=0), 'memory'),
+])
+def test_find_contradiction_limits(limits, reason):
+    clauses = frozenset({
+        frozenset({('p', (('0', ()),))}),
+        frozenset({('NOT', ('p', ('x',))), ('p', (('s', ('x',)),))}),
+        frozenset({('NOT', ('p', ('x',))), ('NOT', ('q', ('x',)))}),
+    })
+    assert p2.find_contradiction(clauses, limits) == p2.Unknown(reason)
+
+
+def test_limits_slow_charges():
+    # slow charges make the limits be checked more often
+    limits = p2.Limits(deadline=time.monotonic() + 0.05)
+    start = time.monotonic()
+    while limits.charge() is None:
+        time.sleep(0.002)
+    assert time.monotonic() - start < 0.5
+
+
+def test_model_search_limits():
+    search = p2._ModelSearch(p2.clause_set(arithmetic))
+    assert search.step(limits=p2.Limits(deadline=0)) == p2.Unknown('deadline')
+    assert search.size == 1
+
+
+def test_find_contradiction_weight_limit():
+    clauses = frozenset({
+        frozenset({('p', (('0', ()),))}),
+        frozenset({('NOT', ('p', ('x',))), ('p', (('s', ('x',)),))}),
+        frozenset({('NOT', ('p', ('x',))), ('NOT', ('q', ('x',)))}),
+    })
+    # short of memory, heavy passive clauses get dropped
+    max_bytes = int(p2._resident_bytes() * 1.5)
+    result = p2.find_contradiction(
+        clauses, p2.Limits(max_bytes=max_bytes, max_clauses=100000))
+    assert not result
+    assert result.dropped > 0
+
+
+def test_find_contradiction_max_given():
+    clauses = frozenset({
+        frozenset({('p', (('0', ()),))}),
+        frozenset({('NOT', ('p', ('x',))), ('p', (('s', ('x',)),))}),
+    })
+    result = p2.find_contradiction(clauses, max_given=100)
+    assert not result
+    assert result == p2.Unknown('given clauses')
 
 
 @pytest.mark.parametrize('clauses, seconds', [
@@ -291,8 +605,8 @@ def test_timeout_untriggered():
     }), 1),
 ])
 def test_find_contradiction(clauses, seconds):
-    assert p2.timeout(
-        lambda done: p2.find_contradiction(done, clauses), seconds)
+    assert p2.find_contradiction(
+        clauses, p2.Limits(deadline=time.monotonic() + seconds))
 
 
 @pytest.mark.parametrize('clauses, seconds', [
@@ -310,8 +624,54 @@ def test_find_contradiction(clauses, seconds):
     }), 1),
 ])
 def test_find_contradiction_failure(clauses, seconds):
-    assert not p2.timeout(
-        lambda done: p2.find_contradiction(done, clauses), seconds)
+    assert not p2.find_contradiction(
+        clauses, p2.Limits(deadline=time.monotonic() + seconds))
+
+
+def test_compile_sets(tmpdir):
+    f_sets = [
+        ['(FORALL x (IMPLIES (p x) (q (f x))))', '(NOT (q (f a)))'],
+        [],
+        ['(EXISTS y (FORALL x (big_f x y)))'],
+    ]
+    sets = p2.compile_sets(f_sets, str(tmpdir.join('sets.cnf')))
+    assert len(sets) == len(f_sets)
+    for formulae, compiled in zip(f_sets, sets):
+        assert compiled.clauses() == p2.clause_set(formulae)
+    sets.close()
+    assert sets[2].clauses() == p2.str_to_cnf(f_sets[2][0])
+    # decoded constants and Skolem terms are the ones the parser shares
+    symbols = p2.SymbolTable()
+    sets = p2.compile_sets(f_sets, str(tmpdir.join('shared.cnf')), symbols)
+    (parsed,), = p2.str_to_cnf(f_sets[0][1], symbols)
+    (decoded,), = sets[0].clauses() - p2.str_to_cnf(f_sets[0][0], symbols)
+    assert decoded[1][1][0][1][0] is parsed[1][1][0][1][0]
+    skolem, = {atom[1][1] for (atom,) in sets[2].clauses()}
+    assert skolem is symbols.skolem('y', ())
+    assert symbols.role(skolem) == 'skolem'
+    sets.close()
+
+
+def test_compile_sets_deep(tmpdir):
+    depth = 3000
+    formula = '(p ' + '(s ' * depth + '(f x 0)' + ')' * depth + ')'
+    sets = p2.compile_sets([['(FORALL x ' + formula + ')']],
+                           str(tmpdir.join('deep.cnf')))
+    ((atom,),) = sets[0].clauses()
+    sets.close()
+    assert p2.clause_weight({atom}) == depth + 4
+    (term,) = atom[1]
+    for _ in range(depth):
+        assert term[0] == 's'
+        (term,) = term[1]
+    assert term == ('f', ('x', ('0', ())))
+
+
+def test_compiled_sets_reject_foreign_files(tmpdir):
+    path = tmpdir.join('bogus.cnf')
+    path.write_binary(b'\0' * 64)
+    with pytest.raises(ValueError):
+        len(p2.CompiledSets(str(path)))
 
 
 arithmetic = [
@@ -343,10 +703,216 @@ def test_peano():
     # '(NOT (eq (plus {1} {0}) {0}))'.format(peano(1), peano(0)),
 ])
 def test_is_inconsistent_arithmetic(inconsistency):  # noqa
-    class FakeEvent:
-        def is_set(self):
-            return False
-    assert p2.is_inconsistent(FakeEvent(), arithmetic + [inconsistency])
+    assert p2.is_inconsistent(arithmetic + [inconsistency])
+
+
+def test_prover_session():
+    session = p2.ProverSession(arithmetic)
+    assert not session.saturate(max_clauses=50)
+    saturated = list(session.clauses)
+    assert session.check(['(NOT (eq {0} {0}))'.format(peano(30))])
+    assert session.check(['(NOT (eq (plus {0} 0) {0}))'.format(peano(30))])
+    assert session.clauses == saturated
+
+    session.push()
+    session.add(['(NOT (eq 0 0))'])
+    assert session.saturate()
+    session.pop()
+    assert session.clauses == saturated
+
+
+@pytest.mark.parametrize('background, goals', [
+    (['(q c)'], ['(FORALL x (AND (EXISTS v (NOT (r v b))) (r x b)))']),
+    ([], ['(NOT (eq (plus (s 0) (s 0)) (s (s 0))))']),
+    ([], ['(NOT (eq (s (s 0)) (s (s 0))))']),
+])
+def test_prover_session_check(background, goals):
+    # Horn sets go to forward chaining as in is_inconsistent, so the
+    # consistent arithmetic goal is decided rather than searched forever
+    if not background:
+        background = arithmetic
+    session = p2.ProverSession(background)
+    session.saturate(max_clauses=50)
+    limits = p2.Limits(deadline=time.monotonic() + 5)
+    assert session.check(goals, limits) is p2.is_inconsistent(
+        list(background) + goals)
+
+
+def test_shared_prefixes():
+    assert p2.shared_prefixes([
+        ['a', 'b', 'x'],
+        ['c'],
+        ['a', 'b', 'y'],
+        ['a', 'z'],
+        ['c', 'd'],
+        ['e'],
+    ]) == {('a', 'b'): [0, 2], ('c',): [1, 4]}
+
+
+def test_split_components():
+    clauses = frozenset().union(*map(p2.str_to_cnf, [
+        '(FORALL x (IMPLIES (p x) (q x)))',
+        '(r a)',
+        '(NOT (q b))',
+        '(OR (r b) (s b))',
+    ]))
+    assert set(p2.split_components(clauses)) == {
+        frozenset({frozenset({('NOT', ('p', ('x',))), ('q', ('x',))}),
+                   frozenset({('NOT', ('q', (('b', ()),)))})}),
+        frozenset({frozenset({('r', (('a', ()),))}),
+                   frozenset({('r', (('b', ()),)), ('s', (('b', ()),))})}),
+    }
+
+
+def test_relevant_subset():
+    axioms = frozenset().union(*map(p2.str_to_cnf, [
+        '(FORALL x (IMPLIES (man x) (mortal x)))',
+        '(man socrates)',
+        '(FORALL x (IMPLIES (stone x) (inert x)))',
+        '(stone rock)',
+    ]))
+    goal = p2.str_to_cnf('(NOT (mortal socrates))')
+    assert p2.relevant_subset(axioms | goal, goal) == goal | \
+        p2.str_to_cnf('(FORALL x (IMPLIES (man x) (mortal x)))') | \
+        p2.str_to_cnf('(man socrates)')
+
+
+def test_is_inconsistent_components():
+    assert p2.is_inconsistent([
+        '(p 0)',
+        '(FORALL x (IMPLIES (p x) (p (s x))))',
+        '(FORALL x (NOT (AND (p x) (r x))))',
+        '(q a)',
+        '(NOT (q a))',
+    ])
+
+
+@pytest.mark.parametrize('clauses, num_vars, result', [
+    ([], 0, True),
+    ([[]], 0, False),
+    ([[1, 2], [-1, 2], [1, -2]], 2, True),
+    ([[1, 2], [-1, 2], [1, -2], [-1, -2]], 2, False),
+    ([[1, 2, 3], [-1], [-2], [-3, 1]], 3, False),
+])
+def test_satisfiable(clauses, num_vars, result):
+    assert p2.satisfiable(clauses, num_vars) is result
+
+
+def pigeonhole(holes):
+    def var(pigeon, hole):
+        return pigeon * holes + hole + 1
+    clauses = [[var(pigeon, hole) for hole in range(holes)]
+               for pigeon in range(holes + 1)]
+    clauses += [[-var(pigeon, hole), -var(other, hole)]
+                for hole in range(holes)
+                for pigeon in range(holes + 1) for other in range(pigeon)]
+    return clauses, (holes + 1) * holes
+
+
+def test_satisfiable_random():
+    rng = random.Random(0)
+    for _ in range(300):
+        num_vars = rng.randint(1, 6)
+        clauses = [[rng.choice([-1, 1]) * rng.randint(1, num_vars)
+                    for _ in range(rng.randint(1, 3))]
+                   for _ in range(rng.randint(0, 30))]
+        expected = any(
+            all(any((literal > 0) == values[abs(literal) - 1]
+                    for literal in clause) for clause in clauses)
+            for values in itertools.product([False, True], repeat=num_vars))
+        assert p2.satisfiable(clauses, num_vars) is expected
+
+
+def test_satisfiable_limits():
+    assert p2.satisfiable(*pigeonhole(5)) is False
+    assert p2.satisfiable(*pigeonhole(6), max_conflicts=10) is None
+    assert p2.satisfiable(*pigeonhole(6), limits=p2.Limits(
+        max_clauses=10, check_interval=1)) == p2.Unknown('clauses')
+
+
+def pigeon_formulae(holes, predicate='in'):
+    formulae = []
+    for pigeon in range(holes + 1):
+        disjunction = '({} p{} h0)'.format(predicate, pigeon)
+        for hole in range(1, holes):
+            disjunction = '(OR ({} p{} h{}) {})'.format(
+                predicate, pigeon, hole, disjunction)
+        formulae.append(disjunction)
+    formulae += ['(NOT (AND ({0} p{1} h{3}) ({0} p{2} h{3})))'.format(
+        predicate, pigeon, other, hole)
+        for hole in range(holes) for pigeon in range(holes + 1)
+        for other in range(pigeon)]
+    return formulae
+
+
+def test_is_inconsistent_undecided_workers():
+    # two large components are decided in worker processes, which stop
+    # at the deadline without an answer
+    formulae = pigeon_formulae(9, 'in') + pigeon_formulae(9, 'at')
+    result = p2.is_inconsistent(
+        formulae, p2.Limits(deadline=time.monotonic() + 1))
+    assert result == p2.Unknown('deadline')
+
+
+def test_is_inconsistent_ground():
+    pigeons = ['(OR (OR (in p{0} h0) (in p{0} h1)) '
+               '(OR (in p{0} h2) (in p{0} h3)))'.format(pigeon)
+               for pigeon in range(5)]
+    pigeons += ['(NOT (AND (in p{0} h{2}) (in p{1} h{2})))'.format(
+        pigeon, other, hole)
+        for hole in range(4) for pigeon in range(5) for other in range(pigeon)]
+    assert p2.is_ground(p2.clause_set(pigeons))
+    assert not p2.is_ground(p2.clause_set(arithmetic))
+    assert p2.is_inconsistent(pigeons)
+    assert p2.is_inconsistent(pigeons[1:]) is False
+    assert p2.ProverSession(pigeons[1:]).check(pigeons[:1])
+
+
+def test_find_model():
+    assert p2.find_model(p2.clause_set(arithmetic)) == 2
+    assert p2.find_model(p2.clause_set(
+        arithmetic + ['(NOT (eq {0} {0}))'.format(peano(3))])) is None
+
+
+def test_find_model_overloaded_functions():
+    # f/1 and f/2 are different functions, and each must be total
+    formulae = ['(FORALL x (OR (p (f x b)) (p (f x))))',
+                '(FORALL y (NOT (p (f y b))))', '(FORALL y (NOT (p (f y))))']
+    assert p2.find_model(p2.clause_set(formulae), max_size=3) is None
+    assert p2.is_inconsistent(formulae) is True
+
+
+def test_is_inconsistent_finds_models():
+    assert p2.is_inconsistent(
+        arithmetic + ['(eq (plus (s 0) 0) (s (s 0)))']) is False
+
+
+def test_find_inconsistent_async():
+    # a strict order with successors has no finite model
+    unbounded = [
+        '(FORALL x (NOT (lt x x)))',
+        '(FORALL x (lt x (s x)))',
+        '(FORALL x (FORALL y (FORALL z '
+        '(IMPLIES (AND (lt x y) (lt y z)) (lt x z)))))',
+    ]
+    f_sets = [['(p a)', '(NOT (p a))'], unbounded, ['(p a)'],
+              arithmetic + ['(NOT (eq 0 0))']]
+
+    async def collect():
+        loop = asyncio.get_event_loop()
+        indices = []
+        async for index in p2.find_inconsistent_async(
+                f_sets, deadline=loop.time() + 2, pool=p2.WorkerPool(4)):
+            indices.append(index)
+        return indices
+
+    loop = asyncio.new_event_loop()
+    try:
+        start = time.monotonic()
+        assert sorted(loop.run_until_complete(collect())) == [0, 3]
+        assert time.monotonic() - start < 10
+    finally:
+        loop.close()
 
 #                 __  __    ______  _____   ____     __    __
 #                /\ \/\ \  /\  _  \/\  _ `\/\  _`\  /\ \  /\ \